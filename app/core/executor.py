@@ -0,0 +1,80 @@
+import os
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+# Core
+from app.core.logging_config import get_logger
+from app.core.messages import Messages
+from app.core.utils import error_response
+
+load_dotenv()
+
+logger = get_logger()
+
+# ? YOLO/torch, OpenCV, Tesseract and liblouis release the GIL while they work,
+# ? so a thread pool keeps the event loop free without pickling uploads/responses.
+# ? Shared YOLO models are serialized per model by registry.use_model
+WORKERS = int(os.getenv("WORKER_THREADS", str(os.cpu_count() or 1)))
+QUEUE_SIZE = int(os.getenv("WORKER_QUEUE_SIZE", "32"))
+TASK_TIMEOUT = float(os.getenv("WORKER_TASK_TIMEOUT", "300"))
+
+_executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="worker")
+_lock = threading.Lock()
+_stats = {"in_flight": 0, "completed": 0, "rejected": 0, "timeouts": 0}
+
+
+def _acquire_slot() -> bool:
+    with _lock:
+        if _stats["in_flight"] >= WORKERS + QUEUE_SIZE:
+            _stats["rejected"] += 1
+            return False
+        _stats["in_flight"] += 1
+        return True
+
+
+def _release_slot(_future) -> None:
+    # ? Released when the task really ends, even after its request timed out
+    with _lock:
+        _stats["in_flight"] -= 1
+        _stats["completed"] += 1
+
+
+class ServiceBusy(Exception):
+    """El pool de trabajo y su cola están llenos."""
+
+
+async def run_task(func, *args, timeout: float = TASK_TIMEOUT, **kwargs):
+    # ? Raises ServiceBusy / asyncio.TimeoutError; callers pick the response
+    if not _acquire_slot():
+        raise ServiceBusy()
+
+    future = _executor.submit(func, *args, **kwargs)
+    future.add_done_callback(_release_slot)
+
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+    except asyncio.TimeoutError:
+        with _lock:
+            _stats["timeouts"] += 1
+        logger.warning(f"{func.__name__} excedió {timeout:.0f}s")
+        raise
+
+
+async def run_service(func, *args, timeout: float = TASK_TIMEOUT, **kwargs):
+    try:
+        return await run_task(func, *args, timeout=timeout, **kwargs)
+    except ServiceBusy:
+        return error_response(Messages.THROTTLER_EXCEPTION, status_code=503)
+    except asyncio.TimeoutError:
+        return error_response(Messages.TASK_TIMEOUT, status_code=504)
+
+
+def executor_stats() -> dict:
+    with _lock:
+        return {"workers": WORKERS, "queue_size": QUEUE_SIZE, **_stats}
+
+
+def shutdown_executor() -> None:
+    _executor.shutdown(wait=False, cancel_futures=True)
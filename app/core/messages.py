@@ -15,6 +15,8 @@ class Messages(str, Enum):
     EXCEPTION_DEFAULT = "Ocurrió un error desconocido."
 
     THROTTLER_EXCEPTION = "Límite de solicitudes superado. Intente más tarde por favor."
+    TASK_TIMEOUT = "La solicitud excedió el tiempo máximo de procesamiento."
+    SERVICE_NOT_READY = "El servicio aún está cargando los modelos."
 
     # Mensajes de éxito
     SUCCESS_SERVICE = "Servicio ejecutado exitosamente."
@@ -33,6 +35,13 @@ class Messages(str, Enum):
     IMAGE_TOO_LARGE = "Archivo demasiado grande."
     IMAGE_INVALID_NAME = "Nombre de archivo inválido."
 
+    # Mensajes de trabajos
+    JOB_CREATED = "Trabajo registrado. Consulte su estado para conocer el progreso."
+    JOB_NOT_FOUND = "Trabajo no encontrado."
+    JOB_NOT_FINISHED = "El trabajo aún no ha terminado."
+    JOB_QUEUE_FULL = "Hay demasiados trabajos pendientes. Intente más tarde por favor."
+    JOB_ALL_PAGES_FAILED = "No se pudo convertir ninguna página del trabajo."
+
     # Mensajes de validación
     VALIDATION_REQUIRED_FIELD = "Este campo es requerido."
     VALIDATION_INVALID_EMAIL = "El formato del email es inválido."
@@ -6,6 +6,8 @@ from .logging_config import get_logger
 
 logger = get_logger()
 
+STREAMING_MEDIA_TYPES = ("application/x-ndjson", "text/event-stream")
+
 
 async def log_responses_middleware(request: Request, call_next):
     start_time = time.time()
@@ -16,6 +18,15 @@ async def log_responses_middleware(request: Request, call_next):
     process_time = time.time() - start_time
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
+    # ? Buffering a stream would hold every record until the last page is done
+    content_type = response.headers.get("content-type", "")
+    if content_type.startswith(STREAMING_MEDIA_TYPES):
+        logger.info(
+            f"{timestamp} | {client_ip} | {request.method} {request.url.path} | "
+            f"Status: {response.status_code} | Streaming: {content_type}"
+        )
+        return response
+
     try:
         chunks = []
         async for chunk in response.body_iterator:
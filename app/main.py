@@ -1,11 +1,20 @@
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.openapi.utils import get_openapi
+from starlette.concurrency import run_in_threadpool
 from dotenv import load_dotenv
 
 # Core
-from app.routers import health, images, braille, text
+from app.routers import health, images, braille, text, jobs
 from app.core import setup_logging, log_responses_middleware
+from app.core.executor import shutdown_executor
+
+# Services
+from app.services.job_service import resume_jobs, shutdown_jobs
+
+# Models
+from app.models.registry import PRELOAD, load_models
 
 # Config Logger
 setup_logging()
@@ -16,10 +25,23 @@ name = os.getenv("NAME", "DotScan API Backend")
 version = os.getenv("VERSION", "1.0.0")
 description = os.getenv("DESCRIPTION", "Api for DotScan")
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # ? Load and warm up the YOLO models before serving the first request
+    if PRELOAD:
+        await run_in_threadpool(load_models)
+    await run_in_threadpool(resume_jobs)
+    yield
+    shutdown_jobs()
+    shutdown_executor()
+
+
 app = FastAPI(
     title=name,
     version=version,
     description=description,
+    lifespan=lifespan,
 )
 
 # Middleware
@@ -33,6 +55,7 @@ app.include_router(health.router, prefix=f"{PREFIX}", tags=["Health"])
 # app.include_router(images.router, prefix=f"{PREFIX}/images", tags=["Images"])
 app.include_router(braille.router, prefix=f"{PREFIX}/braille-to-text", tags=["Braille"])
 app.include_router(text.router, prefix=f"{PREFIX}/text-to-braille", tags=["Text"])
+app.include_router(jobs.router, prefix=f"{PREFIX}/jobs", tags=["Jobs"])
 
 
 def custom_openapi():
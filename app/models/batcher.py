@@ -0,0 +1,91 @@
+import time
+import queue
+import threading
+from concurrent.futures import Future
+
+# Core
+from app.core.logging_config import get_logger
+
+logger = get_logger()
+
+
+class MicroBatcher:
+    """Agrupa imágenes de solicitudes concurrentes en una sola inferencia.
+
+    Espera hasta `max_wait_ms` o hasta juntar `max_batch` imágenes, ejecuta
+    `predict_batch(images)` y devuelve a cada solicitud su resultado.
+    """
+
+    def __init__(self, predict_batch, max_batch: int = 8, max_wait_ms: float = 10):
+        self.predict_batch = predict_batch
+        self.max_batch = max(1, max_batch)
+        self.max_wait_ms = max_wait_ms
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._stats = {"batches": 0, "images": 0, "largest_batch": 0}
+
+    def submit(self, image) -> Future:
+        self._ensure_thread()
+        future = Future()
+        self._queue.put((image, future))
+        return future
+
+    def predict(self, image):
+        return self.submit(image).result()
+
+    def stats(self) -> dict:
+        with self._lock:
+            batches = self._stats["batches"]
+            return {
+                "max_batch": self.max_batch,
+                "max_wait_ms": self.max_wait_ms,
+                "pending": self._queue.qsize(),
+                **self._stats,
+                "avg_batch": self._stats["images"] / batches if batches else 0.0,
+            }
+
+    def _ensure_thread(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="micro-batcher", daemon=True
+                )
+                self._thread.start()
+
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait_ms / 1000
+
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            self._run_batch(self._collect())
+
+    def _run_batch(self, items: list):
+        futures = [future for _, future in items]
+        try:
+            results = self.predict_batch([image for image, _ in items])
+        except Exception as e:
+            logger.error(f"Error en inferencia por lotes: {e}")
+            for future in futures:
+                future.set_exception(e)
+            return
+
+        with self._lock:
+            self._stats["batches"] += 1
+            self._stats["images"] += len(items)
+            self._stats["largest_batch"] = max(self._stats["largest_batch"], len(items))
+
+        for future, result in zip(futures, results):
+            future.set_result(result)
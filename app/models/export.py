@@ -0,0 +1,155 @@
+"""Exporta los modelos YOLO a ONNX/OpenVINO y verifica la paridad con PyTorch.
+
+Uso:
+    python -m app.models.export --model braille --engine onnx --images ./muestras
+"""
+
+import os
+import glob
+import argparse
+import numpy as np
+from ultralytics import YOLO
+
+# Models
+from app.models.registry import MODEL_FILES, model_path
+
+EXPORT_FORMATS = {"onnx": "onnx", "openvino": "openvino"}
+IMAGE_PATTERNS = ("*.jpg", "*.jpeg", "*.png", "*.webp")
+
+
+def export_model(name: str, engine: str, imgsz: int = 640) -> str:
+    if engine not in EXPORT_FORMATS:
+        raise ValueError(f"Motor sin exportación: {engine}")
+
+    model = YOLO(model_path(name, "torch", "fp32"))
+    # ? dynamic keeps the batch axis free for the batched endpoints
+    return model.export(format=EXPORT_FORMATS[engine], imgsz=imgsz, dynamic=True)
+
+
+def list_images(folder: str) -> list[str]:
+    paths = []
+    for pattern in IMAGE_PATTERNS:
+        paths.extend(glob.glob(os.path.join(folder, pattern)))
+    return sorted(paths)
+
+
+def box_iou(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    top_left = np.maximum(boxes_a[:, None, :2], boxes_b[None, :, :2])
+    bottom_right = np.minimum(boxes_a[:, None, 2:], boxes_b[None, :, 2:])
+    intersection = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+
+    area_a = np.prod(boxes_a[:, 2:] - boxes_a[:, :2], axis=1)
+    area_b = np.prod(boxes_b[:, 2:] - boxes_b[:, :2], axis=1)
+    return intersection / (area_a[:, None] + area_b[None, :] - intersection + 1e-9)
+
+
+def match_detections(
+    reference, candidate, min_iou: float = 0.9, conf_tolerance: float = 0.05
+) -> int:
+    # ? Greedy one-to-one matching: same class, overlapping box, similar score
+    ref_boxes = reference.boxes.xyxy.cpu().numpy()
+    cand_boxes = candidate.boxes.xyxy.cpu().numpy()
+    if len(ref_boxes) == 0 or len(cand_boxes) == 0:
+        return 0
+
+    ref_cls = reference.boxes.cls.cpu().numpy()
+    cand_cls = candidate.boxes.cls.cpu().numpy()
+    ref_conf = reference.boxes.conf.cpu().numpy()
+    cand_conf = candidate.boxes.conf.cpu().numpy()
+
+    ious = box_iou(ref_boxes, cand_boxes)
+    valid = (
+        (ref_cls[:, None] == cand_cls[None, :])
+        & (np.abs(ref_conf[:, None] - cand_conf[None, :]) <= conf_tolerance)
+        & (ious >= min_iou)
+    )
+    return len(greedy_match(np.where(valid, ious, 0)))
+
+
+def greedy_match(ious: np.ndarray) -> list[tuple[int, int]]:
+    # ? Pairs rows and columns by decreasing IoU, each used at most once
+    ious = ious.copy()
+    pairs = []
+    for _ in range(min(ious.shape)):
+        i, j = np.unravel_index(np.argmax(ious), ious.shape)
+        if ious[i, j] <= 0:
+            break
+        pairs.append((int(i), int(j)))
+        ious[i, :] = 0
+        ious[:, j] = 0
+    return pairs
+
+
+def check_parity(
+    name: str,
+    engine: str,
+    images: list[str],
+    conf_threshold: float = 0.15,
+    iou_threshold: float = 0.15,
+    min_iou: float = 0.9,
+    conf_tolerance: float = 0.05,
+) -> dict:
+    reference_model = YOLO(model_path(name, "torch", "fp32"))
+    candidate_model = YOLO(model_path(name, engine, "fp32"), task="detect")
+
+    reference_total = candidate_total = matched = 0
+    for image in images:
+        reference = reference_model.predict(
+            source=image, conf=conf_threshold, iou=iou_threshold, verbose=False
+        )[0]
+        candidate = candidate_model.predict(
+            source=image, conf=conf_threshold, iou=iou_threshold, verbose=False
+        )[0]
+
+        reference_total += len(reference.boxes)
+        candidate_total += len(candidate.boxes)
+        matched += match_detections(reference, candidate, min_iou, conf_tolerance)
+
+    return {
+        "images": len(images),
+        "reference_detections": reference_total,
+        "candidate_detections": candidate_total,
+        "matched": matched,
+        "recall": matched / reference_total if reference_total else 1.0,
+        "precision": matched / candidate_total if candidate_total else 1.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", choices=list(MODEL_FILES), default="braille")
+    parser.add_argument("--engine", choices=list(EXPORT_FORMATS), default="onnx")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--images", help="Carpeta de imágenes para la paridad")
+    parser.add_argument("--min-iou", type=float, default=0.9)
+    parser.add_argument("--conf-tolerance", type=float, default=0.05)
+    parser.add_argument("--min-match", type=float, default=0.98)
+    parser.add_argument("--skip-export", action="store_true")
+    args = parser.parse_args()
+
+    if not args.skip_export:
+        exported = export_model(args.model, args.engine, args.imgsz)
+        print(f"Exportado: {exported}")
+
+    if not args.images:
+        return
+
+    report = check_parity(
+        args.model,
+        args.engine,
+        list_images(args.images),
+        min_iou=args.min_iou,
+        conf_tolerance=args.conf_tolerance,
+    )
+    for key, value in report.items():
+        print(f"{key}: {value}")
+
+    if min(report["recall"], report["precision"]) < args.min_match:
+        raise SystemExit(
+            "Paridad insuficiente frente a PyTorch: "
+            f"recall={report['recall']:.3f} precision={report['precision']:.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
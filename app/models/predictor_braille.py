@@ -1,9 +1,20 @@
-from ultralytics import YOLO
+import numpy as np
+from dotenv import load_dotenv
 import os
 
-MODEL_PATH = os.path.join(os.path.dirname(__file__), "yolov8_braille.pt")
+from app.models.batcher import MicroBatcher
+from app.models.raw import RawPrediction, apply_nms, predict_raw
+from app.models.registry import get_model, use_model
 
-model = YOLO(MODEL_PATH)
+load_dotenv()
+
+MODEL_NAME = "braille"
+BATCH_SIZE = int(os.getenv("BRAILLE_BATCH_SIZE", "8"))
+
+# ? Cross-request batching: frames from concurrent requests share one predict
+MICROBATCH = os.getenv("BRAILLE_MICROBATCH", "true").lower() == "true"
+MICROBATCH_SIZE = int(os.getenv("BRAILLE_MICROBATCH_SIZE", "8"))
+MICROBATCH_WAIT_MS = float(os.getenv("BRAILLE_MICROBATCH_WAIT_MS", "10"))
 
 BINARY_TO_LETTER = {
     "100000": "A",
@@ -44,13 +55,63 @@ BINARY_TO_LETTER = {
 }
 
 
+def run_model_raw_batch(
+    images: list[np.ndarray], imgsz: int | None = None
+) -> list[RawPrediction]:
+    # ? Backbone + head only; thresholds and NMS are applied per request
+    with use_model(MODEL_NAME) as model:
+        return predict_raw(model, images, imgsz)
+
+
+def run_model_raw(
+    images: list[np.ndarray], batch_size: int = BATCH_SIZE, imgsz: int | None = None
+) -> list[RawPrediction]:
+    # ? The micro-batcher groups single frames from concurrent requests at the
+    # ? default input size; callers that already hold a batch use batch_size
+    if MICROBATCH and imgsz is None and len(images) == 1:
+        return [batcher.predict(images[0])]
+
+    batch_size = max(1, batch_size)
+    raws = []
+    for start in range(0, len(images), batch_size):
+        raws.extend(run_model_raw_batch(images[start : start + batch_size], imgsz))
+    return raws
+
+
+def filter_raw_prediction(
+    raw: RawPrediction,
+    image: np.ndarray,
+    conf_threshold: float = 0.15,
+    iou_threshold: float = 0.15,
+):
+    # ? Only reads model.names, no predictor state: safe without the lock
+    return apply_nms(get_model(MODEL_NAME), raw, image, conf_threshold, iou_threshold)
+
+
 def run_model_prediction(
-    image_path: str,
+    source: np.ndarray,
     conf_threshold: float = 0.15,
     iou_threshold: float = 0.15,
-    verbose: bool = False,
 ):
-    results = model.predict(
-        source=image_path, conf=conf_threshold, iou=iou_threshold, verbose=verbose
-    )
-    return results
+    [raw] = run_model_raw([source])
+    return [filter_raw_prediction(raw, source, conf_threshold, iou_threshold)]
+
+
+def run_model_prediction_batch(
+    images: list[np.ndarray],
+    conf_threshold: float = 0.15,
+    iou_threshold: float = 0.15,
+    batch_size: int = BATCH_SIZE,
+    imgsz: int | None = None,
+):
+    # ? Sub-batches of batch_size keep page order; one image goes to the micro-batcher
+    raws = run_model_raw(images, batch_size, imgsz)
+    return [
+        filter_raw_prediction(raw, image, conf_threshold, iou_threshold)
+        for raw, image in zip(raws, images)
+    ]
+
+
+batcher = MicroBatcher(
+    run_model_raw_batch, max_batch=MICROBATCH_SIZE, max_wait_ms=MICROBATCH_WAIT_MS
+)
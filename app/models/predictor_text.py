@@ -1,9 +1,8 @@
-from ultralytics import YOLO
-import os
+import numpy as np
 
-MODEL_PATH_TEXT = os.path.join(os.path.dirname(__file__), "yolov8_text.pt")
+from app.models.registry import use_model
 
-model_text = YOLO(MODEL_PATH_TEXT)
+MODEL_NAME = "text"
 
 # Mapeo de clases para tu nuevo modelo
 CARACTERES_MAP = [
@@ -54,13 +53,29 @@ def run_model_prediction_text(
     verbose: bool = False,
     model=None,
 ):
-    if model is None:
-        model = model_text
+    if model is not None:
+        # ? Caller-owned instance, not shared with the worker pool
+        return model.predict(
+            source=image_path,
+            conf=conf_threshold,
+            iou=iou_threshold,
+            verbose=verbose,
+        )
 
-    results = model.predict(
-        source=image_path,
-        conf=conf_threshold,
-        iou=iou_threshold,
-        verbose=verbose,
-    )
-    return results
+    with use_model(MODEL_NAME) as model:
+        return model.predict(
+            source=image_path,
+            conf=conf_threshold,
+            iou=iou_threshold,
+            verbose=verbose,
+        )
+
+
+def detect_text_boxes(
+    image: np.ndarray, conf_threshold: float = 0.25, iou_threshold: float = 0.45
+) -> np.ndarray:
+    """Cajas de caracteres (x1, y1, x2, y2) detectadas por el modelo de texto."""
+    result = run_model_prediction_text(image, conf_threshold, iou_threshold)[0]
+    if result.boxes is None or len(result.boxes) == 0:
+        return np.empty((0, 4), dtype=np.int32)
+    return result.boxes.xyxy.cpu().numpy().round().astype(np.int32)
@@ -0,0 +1,253 @@
+"""Genera la variante INT8 de un modelo YOLO y compara precisión y latencia con FP32.
+
+Uso:
+    python -m app.models.quantize --engine openvino --calibration ./calib --eval ./eval
+"""
+
+import os
+import json
+import time
+import argparse
+import tempfile
+import cv2
+import yaml
+import numpy as np
+from ultralytics import YOLO
+from ultralytics.data.augment import LetterBox
+
+# Models
+from app.models.registry import MODEL_FILES, QUANTIZED_ENGINES, model_path
+from app.models.predictor_braille import BINARY_TO_LETTER
+from app.models.export import box_iou, export_model, greedy_match, list_images
+
+
+def write_calibration_data(folder: str, names: dict) -> str:
+    # ? Ultralytics INT8 export reads calibration images from a dataset yaml
+    folder = os.path.abspath(folder)
+    data = {"path": folder, "train": folder, "val": folder, "names": names}
+    handle = tempfile.NamedTemporaryFile("w", suffix=".yaml", delete=False)
+    with handle:
+        yaml.safe_dump(data, handle, allow_unicode=True)
+    return handle.name
+
+
+def preprocess(image_path: str, imgsz: int) -> np.ndarray:
+    image = LetterBox(new_shape=(imgsz, imgsz), auto=False)(
+        image=cv2.imread(image_path)
+    )
+    image = image[..., ::-1].transpose(2, 0, 1)  # BGR -> RGB, HWC -> CHW
+    return np.ascontiguousarray(image, dtype=np.float32)[None] / 255.0
+
+
+def quantize_openvino(name: str, calibration: str, imgsz: int = 640) -> str:
+    model = YOLO(model_path(name, "torch", "fp32"))
+    data = write_calibration_data(calibration, model.names)
+    try:
+        return model.export(
+            format="openvino", int8=True, data=data, imgsz=imgsz, dynamic=True
+        )
+    finally:
+        os.remove(data)
+
+
+def quantize_onnx(name: str, calibration: str, imgsz: int = 640) -> str:
+    import onnxruntime
+    from onnxruntime.quantization import (
+        CalibrationDataReader,
+        QuantFormat,
+        QuantType,
+        quantize_static,
+    )
+
+    fp32_path = model_path(name, "onnx", "fp32")
+    if not os.path.exists(fp32_path):
+        export_model(name, "onnx", imgsz)
+
+    session = onnxruntime.InferenceSession(
+        fp32_path, providers=["CPUExecutionProvider"]
+    )
+    input_name = session.get_inputs()[0].name
+
+    class ImageCalibrationReader(CalibrationDataReader):
+        def __init__(self, images: list[str]):
+            self.images = iter(images)
+
+        def get_next(self):
+            image_path = next(self.images, None)
+            if image_path is None:
+                return None
+            return {input_name: preprocess(image_path, imgsz)}
+
+    int8_path = model_path(name, "onnx", "int8")
+    quantize_static(
+        fp32_path,
+        int8_path,
+        ImageCalibrationReader(list_images(calibration)),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=True,
+    )
+    return int8_path
+
+
+def label_path(image_path: str) -> str:
+    # ? YOLO layout (images/ -> labels/) or a .txt next to the image
+    stem, _ = os.path.splitext(image_path)
+    yolo_layout = stem.replace(f"{os.sep}images{os.sep}", f"{os.sep}labels{os.sep}")
+    for candidate in (f"{yolo_layout}.txt", f"{stem}.txt"):
+        if os.path.exists(candidate):
+            return candidate
+    return ""
+
+
+def load_labels(image_path: str) -> tuple[np.ndarray, np.ndarray] | None:
+    path = label_path(image_path)
+    if not path:
+        return None
+
+    height, width = cv2.imread(image_path).shape[:2]
+    rows = np.loadtxt(path, ndmin=2)
+    if rows.size == 0:
+        return np.empty(0), np.empty((0, 4))
+
+    cls, cx, cy, w, h = rows[:, :5].T
+    boxes = np.stack(
+        [
+            (cx - w / 2) * width,
+            (cy - h / 2) * height,
+            (cx + w / 2) * width,
+            (cy + h / 2) * height,
+        ],
+        axis=1,
+    )
+    return cls, boxes
+
+
+def predict_timed(model, image_path: str, conf: float, iou: float):
+    start = time.perf_counter()
+    result = model.predict(source=image_path, conf=conf, iou=iou, verbose=False)[0]
+    elapsed = (time.perf_counter() - start) * 1000
+    boxes = result.boxes
+    return boxes.cls.cpu().numpy(), boxes.xyxy.cpu().numpy(), elapsed
+
+
+def score_characters(
+    counts: dict, ref_cls, ref_boxes, pred_cls, pred_boxes, min_iou: float = 0.5
+) -> None:
+    # ? A reference character is correct when a prediction overlaps it with its class
+    for cls in ref_cls:
+        counts.setdefault(int(cls), [0, 0])[0] += 1
+
+    if len(ref_boxes) == 0 or len(pred_boxes) == 0:
+        return
+
+    ious = box_iou(ref_boxes, pred_boxes)
+    for i, j in greedy_match(np.where(ious >= min_iou, ious, 0)):
+        if ref_cls[i] == pred_cls[j]:
+            counts[int(ref_cls[i])][1] += 1
+
+
+def accuracy_report(
+    name: str,
+    engine: str,
+    images: list[str],
+    conf_threshold: float = 0.15,
+    iou_threshold: float = 0.15,
+) -> dict:
+    if not images:
+        raise ValueError("No hay imágenes para el reporte de precisión")
+
+    fp32_model = YOLO(model_path(name, engine, "fp32"), task="detect")
+    int8_model = YOLO(model_path(name, engine, "int8"), task="detect")
+
+    # ? Warm both engines so the first image does not skew latency
+    for model in (fp32_model, int8_model):
+        predict_timed(model, images[0], conf_threshold, iou_threshold)
+
+    uses_labels = all(label_path(image) for image in images)
+    counts = {"fp32": {}, "int8": {}}
+    latencies = {"fp32": [], "int8": []}
+
+    for image in images:
+        fp32_cls, fp32_boxes, fp32_ms = predict_timed(
+            fp32_model, image, conf_threshold, iou_threshold
+        )
+        int8_cls, int8_boxes, int8_ms = predict_timed(
+            int8_model, image, conf_threshold, iou_threshold
+        )
+        latencies["fp32"].append(fp32_ms)
+        latencies["int8"].append(int8_ms)
+
+        ref_cls, ref_boxes = (
+            load_labels(image) if uses_labels else (fp32_cls, fp32_boxes)
+        )
+        score_characters(counts["fp32"], ref_cls, ref_boxes, fp32_cls, fp32_boxes)
+        score_characters(counts["int8"], ref_cls, ref_boxes, int8_cls, int8_boxes)
+
+    names = fp32_model.names
+    characters = {}
+    for cls, (total, _) in sorted(counts["fp32"].items()):
+        binary = names[cls].strip()
+        characters[BINARY_TO_LETTER.get(binary, binary)] = {
+            "total": total,
+            "fp32": counts["fp32"][cls][1] / total,
+            "int8": counts["int8"][cls][1] / total,
+        }
+
+    summary = {}
+    for precision in ("fp32", "int8"):
+        total = sum(total for total, _ in counts[precision].values())
+        correct = sum(correct for _, correct in counts[precision].values())
+        summary[precision] = {
+            "accuracy": correct / total if total else 1.0,
+            "latency_ms": float(np.mean(latencies[precision])),
+        }
+
+    return {
+        "images": len(images),
+        "reference": "labels" if uses_labels else "fp32",
+        **summary,
+        "speedup": summary["fp32"]["latency_ms"] / summary["int8"]["latency_ms"],
+        "characters": characters,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", choices=list(MODEL_FILES), default="braille")
+    parser.add_argument("--engine", choices=list(QUANTIZED_ENGINES), default="openvino")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--calibration", help="Carpeta de imágenes de calibración")
+    parser.add_argument("--eval", help="Carpeta de imágenes para el reporte")
+    parser.add_argument("--output", help="Ruta del reporte JSON")
+    args = parser.parse_args()
+
+    if args.calibration:
+        quantize = quantize_openvino if args.engine == "openvino" else quantize_onnx
+        print(f"Exportado: {quantize(args.model, args.calibration, args.imgsz)}")
+
+    if not args.eval:
+        return
+
+    images = list_images(args.eval)
+    if not images:
+        raise SystemExit(f"No se encontraron imágenes en {args.eval}")
+
+    report = accuracy_report(args.model, args.engine, images)
+    print(
+        f"Referencia: {report['reference']} | imágenes: {report['images']}\n"
+        f"FP32: {report['fp32']['accuracy']:.4f} @ {report['fp32']['latency_ms']:.1f} ms\n"
+        f"INT8: {report['int8']['accuracy']:.4f} @ {report['int8']['latency_ms']:.1f} ms\n"
+        f"Speedup: {report['speedup']:.2f}x"
+    )
+    for letter, row in report["characters"].items():
+        print(f"  {letter}: {row['fp32']:.3f} -> {row['int8']:.3f} ({row['total']})")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
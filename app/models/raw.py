@@ -0,0 +1,75 @@
+import os
+import math
+import numpy as np
+from dataclasses import dataclass
+from dotenv import load_dotenv
+from ultralytics.engine.results import Results
+from ultralytics.utils import ops
+from ultralytics.utils.nms import non_max_suppression
+
+load_dotenv()
+
+MAX_DETECTIONS = int(os.getenv("MAX_DETECTIONS", "1000"))
+
+
+@dataclass
+class RawPrediction:
+    """Salida del modelo antes del umbral de confianza y del NMS."""
+
+    preds: object  # torch.Tensor (1, 4 + nc, anchors)
+    input_shape: tuple[int, int]  # tamaño tras el letterbox
+    orig_shape: tuple[int, int]
+
+
+def ensure_predictor(model):
+    # ? The ultralytics predictor is built lazily by the first predict call
+    if model.predictor is None:
+        model.predict(source=np.zeros((32, 32, 3), dtype=np.uint8), verbose=False)
+    return model.predictor
+
+
+def predict_raw(
+    model, images: list[np.ndarray], imgsz: int | None = None
+) -> list[RawPrediction]:
+    predictor = ensure_predictor(model)
+
+    # ? imgsz only affects the letterbox; callers hold the model lock
+    default_imgsz = predictor.imgsz
+    if imgsz:
+        # ? AutoBackend.stride is an int; raw nn.Module strides are tensors
+        stride = int(np.max(np.asarray(predictor.model.stride)))
+        size = math.ceil(imgsz / stride) * stride
+        predictor.imgsz = [size, size]
+    try:
+        batch = predictor.preprocess(images)
+    finally:
+        predictor.imgsz = default_imgsz
+
+    preds = predictor.inference(batch)
+    if isinstance(preds, (list, tuple)):
+        preds = preds[0]
+
+    # ? A slice is a view of the whole batch output; cloning lets each cached
+    # ? entry keep only its own image
+    input_shape = tuple(batch.shape[2:])
+    return [
+        RawPrediction(preds[i : i + 1].clone(), input_shape, image.shape[:2])
+        for i, image in enumerate(images)
+    ]
+
+
+def apply_nms(
+    model,
+    raw: RawPrediction,
+    image: np.ndarray,
+    conf_threshold: float,
+    iou_threshold: float,
+    max_det: int = MAX_DETECTIONS,
+) -> Results:
+    # ? Same thresholding/NMS as DetectionPredictor.postprocess; NMS rewrites
+    # ? the boxes in place, so it works on a copy of the cached output
+    boxes = non_max_suppression(
+        raw.preds.clone(), conf_threshold, iou_threshold, max_det=max_det
+    )[0]
+    boxes[:, :4] = ops.scale_boxes(raw.input_shape, boxes[:, :4], raw.orig_shape)
+    return Results(orig_img=image, path="", names=model.names, boxes=boxes)
@@ -0,0 +1,160 @@
+import os
+import threading
+from contextlib import contextmanager
+import numpy as np
+from ultralytics import YOLO
+from dotenv import load_dotenv
+
+# Core
+from app.core import get_logger
+
+load_dotenv()
+
+logger = get_logger()
+
+MODELS_DIR = os.path.dirname(__file__)
+MODEL_FILES = {
+    "braille": "yolov8_braille.pt",
+    "text": "yolov8_text.pt",
+}
+
+# ? Ultralytics names exported weights after the .pt file plus these suffixes
+ENGINE_SUFFIXES = {
+    "torch": ".pt",
+    "onnx": ".onnx",
+    "openvino": "_openvino_model",
+}
+INFERENCE_ENGINE = os.getenv("INFERENCE_ENGINE", "torch").lower()
+
+# ? INT8 weights are tagged "_int8" before the engine suffix, as ultralytics does
+PRECISIONS = ("fp32", "int8")
+QUANTIZED_ENGINES = ("onnx", "openvino")
+
+PRELOAD = os.getenv("PRELOAD_MODELS", "true").lower() == "true"
+# ? The text model is only used by detection-guided OCR
+SERVED_MODELS = ["braille"] + (
+    ["text"] if os.getenv("OCR_DETECTION_GUIDED", "false").lower() == "true" else []
+)
+
+WARMUP = os.getenv("MODEL_WARMUP", "true").lower() == "true"
+WARMUP_SIZE = int(os.getenv("MODEL_WARMUP_SIZE", "640"))
+
+STATUS_PENDING = "pending"
+STATUS_LOADING = "loading"
+STATUS_READY = "ready"
+STATUS_FAILED = "failed"
+
+_models: dict[str, YOLO] = {}
+_status: dict[str, str] = {name: STATUS_PENDING for name in MODEL_FILES}
+_locks: dict[str, threading.Lock] = {name: threading.Lock() for name in MODEL_FILES}
+# ? Ultralytics predictors are not thread-safe: one inference at a time per model
+_inference_locks: dict[str, threading.Lock] = {
+    name: threading.Lock() for name in MODEL_FILES
+}
+
+
+def model_engine(name: str) -> str:
+    engine = os.getenv(f"{name.upper()}_INFERENCE_ENGINE", INFERENCE_ENGINE).lower()
+    if engine not in ENGINE_SUFFIXES:
+        raise ValueError(
+            f"Motor de inferencia inválido: {engine}. "
+            f"Opciones válidas: {', '.join(ENGINE_SUFFIXES)}"
+        )
+    return engine
+
+
+def model_precision(name: str) -> str:
+    precision = os.getenv(f"{name.upper()}_MODEL_PRECISION", "fp32").lower()
+    if precision not in PRECISIONS:
+        raise ValueError(
+            f"Precisión inválida: {precision}. Opciones válidas: {', '.join(PRECISIONS)}"
+        )
+    return precision
+
+
+def model_path(
+    name: str, engine: str | None = None, precision: str | None = None
+) -> str:
+    engine = engine or model_engine(name)
+    precision = precision or model_precision(name)
+    if precision == "int8" and engine not in QUANTIZED_ENGINES:
+        raise ValueError(
+            f"INT8 requiere uno de estos motores: {', '.join(QUANTIZED_ENGINES)}"
+        )
+
+    stem, _ = os.path.splitext(MODEL_FILES[name])
+    tag = "_int8" if precision == "int8" else ""
+    return os.path.join(MODELS_DIR, f"{stem}{tag}{ENGINE_SUFFIXES[engine]}")
+
+
+def warmup_model(model: YOLO, size: int = WARMUP_SIZE) -> None:
+    # ? First predict builds the predictor and allocates buffers
+    blank = np.zeros((size, size, 3), dtype=np.uint8)
+    model.predict(source=blank, verbose=False)
+
+
+def get_model(name: str) -> YOLO:
+    if name not in MODEL_FILES:
+        raise KeyError(f"Modelo desconocido: {name}")
+
+    model = _models.get(name)
+    if model is not None:
+        return model
+
+    with _locks[name]:
+        # ? Another thread may have finished loading while we waited
+        if name in _models:
+            return _models[name]
+
+        _status[name] = STATUS_LOADING
+        try:
+            model = YOLO(model_path(name), task="detect")
+            if WARMUP:
+                warmup_model(model)
+        except Exception:
+            _status[name] = STATUS_FAILED
+            raise
+
+        _models[name] = model
+        _status[name] = STATUS_READY
+        logger.info(
+            f"Modelo '{name}' ({model_engine(name)}, {model_precision(name)}) "
+            f"cargado desde {model_path(name)}"
+        )
+        return model
+
+
+@contextmanager
+def use_model(name: str):
+    """Modelo compartido con su lock de inferencia tomado.
+
+    Los workers de WORKER_THREADS comparten una sola instancia por modelo y el
+    predictor de ultralytics guarda estado por llamada (args, imgsz, buffers),
+    así que toda inferencia debe pasar por aquí.
+    """
+    model = get_model(name)
+    with _inference_locks[name]:
+        yield model
+
+
+def load_models(names: list[str] | None = None) -> None:
+    for name in names or SERVED_MODELS:
+        try:
+            get_model(name)
+        except Exception as e:
+            logger.error(f"No se pudo cargar el modelo '{name}': {e}")
+
+
+def models_status() -> dict[str, str]:
+    return dict(_status)
+
+
+def is_ready(name: str | None = None) -> bool:
+    if name is not None:
+        return _status.get(name) == STATUS_READY
+
+    # ? Without preloading the models load on first use: ready unless one failed
+    accepted = (
+        (STATUS_READY,) if PRELOAD else (STATUS_PENDING, STATUS_LOADING, STATUS_READY)
+    )
+    return all(_status[name] in accepted for name in SERVED_MODELS)
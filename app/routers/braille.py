@@ -1,8 +1,12 @@
 from typing import List
-from fastapi import APIRouter, UploadFile, File, Depends
+from fastapi import APIRouter, UploadFile, File, Depends, Query
+
+# Core
+from app.core.executor import run_service
 
 # Schemas
 from app.schemas.braille import UuidBraille
+from app.schemas.image import OutputMode, StreamFormat
 
 # Services
 from app.services.braille_service import (
@@ -10,6 +14,7 @@ from app.services.braille_service import (
     upload_image_service,
     upload_batch_images_service,
     upload_batch_images_to_pdf,
+    stream_batch_images_service,
 )
 
 router = APIRouter(tags=["Braille"])
@@ -28,10 +33,20 @@ router = APIRouter(tags=["Braille"])
 @router.post(
     "",
     summary="API para dibujar los caracteres brailles",
-    description="Sube una imagen y retorna una imagen con los caracteres dibujados",
+    description=(
+        "Sube una imagen y retorna una imagen con los caracteres dibujados. "
+        "output=json retorna solo las detecciones y output=preview una imagen reducida"
+    ),
 )
-async def upload_image(file: UploadFile = File(...)):
-    return upload_image_service(file)
+async def upload_image(
+    file: UploadFile = File(...),
+    conf_threshold: float = Query(0.15, ge=0, le=1),
+    iou_threshold: float = Query(0.15, ge=0, le=1),
+    output: OutputMode = Query(OutputMode.IMAGE),
+):
+    return await run_service(
+        upload_image_service, file, conf_threshold, iou_threshold, output
+    )
 
 
 @router.post(
@@ -39,8 +54,31 @@ async def upload_image(file: UploadFile = File(...)):
     summary="API para subir múltiples imágenes en braille",
     description="Sube muchas imágenes y retorna un texto con los caracteres traducidos",
 )
-async def upload_batch_images(files: List[UploadFile] = File(...)):
-    return upload_batch_images_service(files)
+async def upload_batch_images(
+    files: List[UploadFile] = File(...),
+    conf_threshold: float = Query(0.15, ge=0, le=1),
+    iou_threshold: float = Query(0.15, ge=0, le=1),
+):
+    return await run_service(
+        upload_batch_images_service, files, conf_threshold, iou_threshold
+    )
+
+
+@router.post(
+    "/text/stream",
+    summary="API para traducir múltiples imágenes en braille por streaming",
+    description=(
+        "Sube muchas imágenes y emite un registro por página (índice, texto, braille "
+        "y tiempo) apenas está listo, en NDJSON o SSE"
+    ),
+)
+async def stream_batch_images(
+    files: List[UploadFile] = File(...),
+    conf_threshold: float = Query(0.15, ge=0, le=1),
+    iou_threshold: float = Query(0.15, ge=0, le=1),
+    format: StreamFormat = Query(StreamFormat.NDJSON),
+):
+    return stream_batch_images_service(files, conf_threshold, iou_threshold, format)
 
 
 @router.post(
@@ -48,5 +86,11 @@ async def upload_batch_images(files: List[UploadFile] = File(...)):
     summary="API para subir múltiples imágenes en braille",
     description="Sube muchas imágenes y retorna un archivo pdf con los caracteres traducidos",
 )
-async def upload_batch_pdf(files: List[UploadFile] = File(...)):
-    return upload_batch_images_to_pdf(files)
+async def upload_batch_pdf(
+    files: List[UploadFile] = File(...),
+    conf_threshold: float = Query(0.15, ge=0, le=1),
+    iou_threshold: float = Query(0.15, ge=0, le=1),
+):
+    return await run_service(
+        upload_batch_images_to_pdf, files, conf_threshold, iou_threshold
+    )
@@ -4,6 +4,21 @@ from fastapi import APIRouter
 from app.core.messages import Messages
 from app.core.utils import success_response, error_response
 
+from app.core.executor import executor_stats
+
+# Models
+from app.models.registry import SERVED_MODELS, is_ready, models_status
+from app.models.predictor_braille import MICROBATCH, batcher
+
+# Utils
+from app.utils.braille_tools import cascade_stats
+from app.utils.cache import (
+    raw_prediction_cache,
+    recognition_cache,
+    translation_cache,
+)
+from app.utils.ocr import ocr_budget, ocr_engine
+
 router = APIRouter(tags=["Health"])
 
 
@@ -15,3 +30,44 @@ router = APIRouter(tags=["Health"])
 )
 async def health():
     return success_response(message=Messages.SUCCESS_SERVICE, status_code=200)
+
+
+@router.get(
+    "/ready",
+    summary="API para obtener el estado de los modelos",
+    description="Retorna 200 cuando los modelos que sirve el despliegue están cargados y precalentados",
+    tags=["Health"],
+)
+async def ready():
+    if not is_ready():
+        return error_response(message=Messages.SERVICE_NOT_READY, status_code=503)
+
+    return success_response(
+        message=Messages.SUCCESS_SERVICE,
+        data={"models": models_status(), "served": SERVED_MODELS},
+        status_code=200,
+    )
+
+
+@router.get(
+    "/metrics",
+    summary="API para obtener métricas del servicio",
+    description="Retorna el estado de los modelos, del pool de trabajo, del micro-batching y de las cachés",
+    tags=["Health"],
+)
+async def metrics():
+    return success_response(
+        message=Messages.SUCCESS_SERVICE,
+        data={
+            "models": models_status(),
+            "executor": executor_stats(),
+            "braille_batcher": {"enabled": MICROBATCH, **batcher.stats()},
+            "braille_cascade": cascade_stats(),
+            "ocr_engine": ocr_engine(),
+            "ocr_budget": ocr_budget(),
+            "recognition_cache": recognition_cache.stats(),
+            "raw_prediction_cache": raw_prediction_cache.stats(),
+            "braille_translation_cache": translation_cache.stats(),
+        },
+        status_code=200,
+    )
@@ -0,0 +1,59 @@
+from uuid import UUID
+from typing import List
+from fastapi import APIRouter, UploadFile, File, Query
+
+# Core
+from app.core.executor import run_service
+
+# Services
+from app.services.job_service import (
+    download_job_service,
+    get_job_service,
+    submit_job_service,
+)
+
+router = APIRouter(tags=["Jobs"])
+
+
+@router.post(
+    "/braille-pdf",
+    summary="API para convertir un libro en braille a pdf en segundo plano",
+    description="Sube muchas imágenes y retorna el id del trabajo para consultar su progreso",
+    status_code=202,
+)
+async def submit_braille_pdf(
+    files: List[UploadFile] = File(...),
+    conf_threshold: float = Query(0.15, ge=0, le=1),
+    iou_threshold: float = Query(0.15, ge=0, le=1),
+):
+    params = {"conf_threshold": conf_threshold, "iou_threshold": iou_threshold}
+    return await run_service(submit_job_service, "braille-pdf", files, params)
+
+
+@router.post(
+    "/text-brf",
+    summary="API para convertir un libro en texto convencional a brf en segundo plano",
+    description="Sube muchas imágenes y retorna el id del trabajo para consultar su progreso",
+    status_code=202,
+)
+async def submit_text_brf(files: List[UploadFile] = File(...)):
+    params = {"conf_threshold": 0.001, "confidence_threshold": 30, "lang": "spa"}
+    return await run_service(submit_job_service, "text-brf", files, params)
+
+
+@router.get(
+    "/{job_id}",
+    summary="API para consultar un trabajo",
+    description="Retorna el estado y el progreso del trabajo",
+)
+async def get_job(job_id: UUID):
+    return get_job_service(job_id.hex)
+
+
+@router.get(
+    "/{job_id}/download",
+    summary="API para descargar el resultado de un trabajo",
+    description="Retorna el archivo generado cuando el trabajo terminó",
+)
+async def download_job(job_id: UUID):
+    return download_job_service(job_id.hex)
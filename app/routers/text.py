@@ -1,8 +1,12 @@
 from typing import List
-from fastapi import APIRouter, UploadFile, File, Depends
+from fastapi import APIRouter, UploadFile, File, Depends, Query
+
+# Core
+from app.core.executor import run_service
 
 # Schemas
 from app.schemas.braille import UuidBraille
+from app.schemas.image import OutputMode, StreamFormat
 
 # Services
 from app.services.text_service import (
@@ -10,6 +14,7 @@ from app.services.text_service import (
     upload_image_service_to_text,
     upload_batch_images_service,
     upload_batch_images_to_brf,
+    stream_batch_images_service,
 )
 
 router = APIRouter(tags=["Text"])
@@ -18,10 +23,15 @@ router = APIRouter(tags=["Text"])
 @router.post(
     "",
     summary="API para detectar caracteres en una imagen",
-    description="Sube una imagen y retorna una imagen con los caracteres encontrados",
+    description=(
+        "Sube una imagen y retorna una imagen con los caracteres encontrados. "
+        "output=json retorna solo las detecciones y output=preview una imagen reducida"
+    ),
 )
-async def upload_image(file: UploadFile = File(...)):
-    return upload_image_service(file)
+async def upload_image(
+    file: UploadFile = File(...), output: OutputMode = Query(OutputMode.IMAGE)
+):
+    return await run_service(upload_image_service, file, output)
 
 
 @router.post(
@@ -30,7 +40,7 @@ async def upload_image(file: UploadFile = File(...)):
     description="Sube una imagen y retorna una imagen con los caracteres traducidos",
 )
 async def upload_image(file: UploadFile = File(...)):
-    return upload_image_service_to_text(file)
+    return await run_service(upload_image_service_to_text, file)
 
 
 @router.post(
@@ -39,7 +49,22 @@ async def upload_image(file: UploadFile = File(...)):
     description="Sube muchas imágenes y retorna un texto con los caracteres traducidos",
 )
 async def upload_batch_images(files: List[UploadFile] = File(...)):
-    return upload_batch_images_service(files)
+    return await run_service(upload_batch_images_service, files)
+
+
+@router.post(
+    "/text/stream",
+    summary="API para traducir múltiples imágenes en texto convencional por streaming",
+    description=(
+        "Sube muchas imágenes y emite un registro por página (índice, texto, braille "
+        "y tiempo) apenas está listo, en NDJSON o SSE"
+    ),
+)
+async def stream_batch_images(
+    files: List[UploadFile] = File(...),
+    format: StreamFormat = Query(StreamFormat.NDJSON),
+):
+    return stream_batch_images_service(files, fmt=format)
 
 
 @router.post(
@@ -48,4 +73,4 @@ async def upload_batch_images(files: List[UploadFile] = File(...)):
     description="Sube muchas imágenes y retorna un archivo pdf con los caracteres traducidos",
 )
 async def upload_batch_pdf(files: List[UploadFile] = File(...)):
-    return upload_batch_images_to_brf(files)
+    return await run_service(upload_batch_images_to_brf, files)
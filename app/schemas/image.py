@@ -1,3 +1,4 @@
+from enum import Enum
 from pydantic import BaseModel
 from typing import List
 from uuid import UUID
@@ -12,3 +13,14 @@ class BatchUploadResponse(BaseModel):
     successful_uploads: int
     failed_uploads: int
     results: List[dict]
+
+
+class OutputMode(str, Enum):
+    IMAGE = "image"
+    JSON = "json"
+    PREVIEW = "preview"
+
+
+class StreamFormat(str, Enum):
+    NDJSON = "ndjson"
+    SSE = "sse"
@@ -5,16 +5,19 @@ import glob
 import shutil
 import numpy as np
 from PIL import Image
+from functools import partial
 from typing import List
 from datetime import datetime
 from fastapi import HTTPException, UploadFile
 from fastapi.responses import FileResponse, StreamingResponse
 
-
 # Core
 from app.core.utils import success_response, error_response
 from app.core.messages import Messages
 
+# Schemas
+from app.schemas.image import OutputMode, StreamFormat
+
 # Utils
 from app.utils.file import (
     generate_unique_filename,
@@ -22,8 +25,14 @@ from app.utils.file import (
     validate_file_size,
 )
 from app.utils.pdf import text_to_pdf
+from app.utils.render import RENDER_MEDIA_TYPE
+from app.utils.stream import streaming_pages_response
 from app.utils.brf import text_to_ascii_braille
-from app.utils.braille_tools import image_braille_to_segmentation, image_braille_to_text
+from app.utils.braille_tools import (
+    image_braille_to_segmentation,
+    image_braille_to_text,
+    images_braille_to_text,
+)
 
 NFS_PATH = os.getenv("NFS_PATH", "/")
 
@@ -43,13 +52,21 @@ def get_image_service(uuid: str):
 
 
 def upload_image_service(
-    file: UploadFile, conf_threshold: float = 0.15, iou_threshold: float = 0.15
+    file: UploadFile,
+    conf_threshold: float = 0.15,
+    iou_threshold: float = 0.15,
+    output: OutputMode = OutputMode.IMAGE,
 ):
     try:
         validate_file_extension(file.filename)
         validate_file_size(file)
-        img_bytes = image_braille_to_segmentation(file, conf_threshold, iou_threshold)
-        return StreamingResponse(img_bytes, media_type="image/jpeg")
+        result = image_braille_to_segmentation(
+            file, conf_threshold, iou_threshold, output=output
+        )
+        if output == OutputMode.JSON:
+            return success_response(message=Messages.SUCCESS_OPERATION, data=result)
+
+        return StreamingResponse(result, media_type=RENDER_MEDIA_TYPE)
     except Exception as e:
         return error_response(f"{Messages.IMAGE_UPLOAD_ERROR}: {e}", status_code=500)
 
@@ -72,28 +89,29 @@ def upload_image_service_to_text(
 def upload_batch_images_service(
     files: List[UploadFile], conf_threshold: float = 0.15, iou_threshold: float = 0.15
 ):
-    results = ""
+    valid_files = []
     successful_uploads = 0
     failed_uploads = 0
 
     for file in files:
         try:
             validate_file_extension(file.filename)
-            file_size = validate_file_size(file)
-            text_converted = image_braille_to_text(file, conf_threshold, iou_threshold)
-            results += f"{text_converted}\n"
-            successful_uploads += 1
+            validate_file_size(file)
+            valid_files.append(file)
 
         except HTTPException as e:
             failed_uploads += 1
 
-        except Exception as e:
-            failed_uploads += 1
-            return error_response(
-                f"{Messages.IMAGE_UPLOAD_ERROR}: {e}", status_code=500
-            )
+    try:
+        texts_converted = images_braille_to_text(
+            valid_files, conf_threshold, iou_threshold
+        )
+        successful_uploads = len(texts_converted)
+        results = "".join(f"{text_converted}\n" for text_converted in texts_converted)
+        braille = text_to_ascii_braille(results)
 
-    braille = text_to_ascii_braille(text_converted)
+    except Exception as e:
+        return error_response(f"{Messages.IMAGE_UPLOAD_ERROR}: {e}", status_code=500)
 
     return success_response(
         message=Messages.IMAGE_UPLOAD_BATCH_SUCCESS,
@@ -108,20 +126,45 @@ def upload_batch_images_service(
     )
 
 
+def braille_page_to_text(
+    file: UploadFile, conf_threshold: float = 0.15, iou_threshold: float = 0.15
+) -> dict:
+    validate_file_extension(file.filename)
+    validate_file_size(file)
+    text = image_braille_to_text(file, conf_threshold, iou_threshold)
+    return {"text": text, "braille": text_to_ascii_braille(text)}
+
+
+def stream_batch_images_service(
+    files: List[UploadFile],
+    conf_threshold: float = 0.15,
+    iou_threshold: float = 0.15,
+    fmt: StreamFormat = StreamFormat.NDJSON,
+):
+    return streaming_pages_response(
+        files,
+        partial(
+            braille_page_to_text,
+            conf_threshold=conf_threshold,
+            iou_threshold=iou_threshold,
+        ),
+        fmt.value,
+    )
+
+
 def upload_batch_images_to_pdf(
     files: List[UploadFile], conf_threshold: float = 0.15, iou_threshold: float = 0.15
 ):
-    text = ""
-
-    for file in files:
-        try:
+    try:
+        for file in files:
             validate_file_extension(file.filename)
             validate_file_size(file)
-            text_converted = image_braille_to_text(file, conf_threshold, iou_threshold)
-            text += f"{text_converted}\n"
 
-        except Exception as e:
-            return error_response(f"{Messages.EXCEPTION_DEFAULT}: {e}", status_code=500)
+        texts_converted = images_braille_to_text(files, conf_threshold, iou_threshold)
+        text = "".join(f"{text_converted}\n" for text_converted in texts_converted)
+
+    except Exception as e:
+        return error_response(f"{Messages.EXCEPTION_DEFAULT}: {e}", status_code=500)
 
     current_date = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
     pdf_bytes = text_to_pdf(text)
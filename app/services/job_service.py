@@ -0,0 +1,244 @@
+import os
+import threading
+from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import FileResponse
+from dotenv import load_dotenv
+
+# Core
+from app.core.logging_config import get_logger
+from app.core.messages import Messages
+from app.core.utils import success_response, error_response
+
+# Utils
+from app.utils.braille_tools import images_braille_to_text
+from app.utils.brf import text_to_brf_file
+from app.utils.file import validate_file_extension, validate_file_size
+from app.utils.jobs import (
+    create_job,
+    list_active_jobs,
+    output_path,
+    page_path,
+    pending_pages,
+    purge_expired_jobs,
+    read_job,
+    read_result,
+    save_result,
+    update_job,
+)
+from app.utils.pdf import text_to_pdf
+from app.utils.text_tools import images_text_to_text
+
+load_dotenv()
+
+logger = get_logger()
+
+# ? Background jobs get their own small pool so books never starve requests
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "1"))
+JOB_MAX_PENDING = int(os.getenv("JOB_MAX_PENDING", "50"))
+JOB_CHUNK_SIZE = int(os.getenv("JOB_CHUNK_SIZE", "8"))
+
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="job")
+_lock = threading.Lock()
+_scheduled: set[str] = set()
+
+JOB_KINDS = {
+    "braille-pdf": {"extension": ".pdf", "media_type": "application/pdf"},
+    "text-brf": {"extension": ".brf", "media_type": "application/x-brf"},
+}
+
+
+def convert_pages(kind: str, uploads: list[UploadFile], params: dict) -> list[str]:
+    if kind == "braille-pdf":
+        return images_braille_to_text(
+            uploads, params["conf_threshold"], params["iou_threshold"]
+        )
+
+    return images_text_to_text(
+        uploads,
+        conf_threshold=params["conf_threshold"],
+        confidence_threshold=params["confidence_threshold"],
+        lang=params["lang"],
+    )
+
+
+def convert_job_pages(job: dict, indices: list[int]) -> list[str]:
+    handles = [
+        open(page_path(job["id"], index, job["pages"][index]), "rb")
+        for index in indices
+    ]
+    try:
+        uploads = [
+            UploadFile(file=handle, filename=job["pages"][index])
+            for handle, index in zip(handles, indices)
+        ]
+        return convert_pages(job["kind"], uploads, job["params"])
+    finally:
+        for handle in handles:
+            handle.close()
+
+
+def convert_chunk(job: dict, chunk: list[int]) -> tuple[list[str], dict[str, str]]:
+    try:
+        return convert_job_pages(job, chunk), {}
+    except Exception as e:
+        logger.warning(f"Trabajo {job['id']}: lote fallido ({e}), página por página")
+
+    # ? One bad page must not sink its chunk: it is recorded and left empty
+    texts, errors = [], {}
+    for index in chunk:
+        try:
+            texts.extend(convert_job_pages(job, [index]))
+        except Exception as e:
+            errors[str(index)] = str(e)
+            texts.append("")
+    return texts, errors
+
+
+def render_output(kind: str, text: str):
+    if kind == "braille-pdf":
+        return text_to_pdf(text)
+    return text_to_brf_file(text)
+
+
+def run_job(job_id: str) -> None:
+    try:
+        job = read_job(job_id)
+        pending = pending_pages(job)
+        done = job["total_pages"] - len(pending)
+        page_errors = job.get("page_errors", {})
+        update_job(job_id, status="running", completed_pages=done)
+
+        for start in range(0, len(pending), JOB_CHUNK_SIZE):
+            chunk = pending[start : start + JOB_CHUNK_SIZE]
+            texts, errors = convert_chunk(job, chunk)
+
+            # ? Errors are stored before the results so a resume never loses them
+            if errors:
+                page_errors.update(errors)
+                update_job(job_id, page_errors=page_errors)
+            for index, text in zip(chunk, texts):
+                save_result(job_id, index, text)
+            update_job(job_id, completed_pages=done + start + len(chunk))
+
+        if page_errors and len(page_errors) == job["total_pages"]:
+            raise RuntimeError(Messages.JOB_ALL_PAGES_FAILED.value)
+
+        text = "".join(
+            f"{read_result(job_id, index)}\n" for index in range(job["total_pages"])
+        )
+        extension = JOB_KINDS[job["kind"]]["extension"]
+        with open(output_path(job_id, extension), "wb") as handle:
+            handle.write(render_output(job["kind"], text).getvalue())
+
+        update_job(job_id, status="done", output=f"output{extension}")
+
+    except Exception as e:
+        logger.error(f"Trabajo {job_id} falló: {e}")
+        update_job(job_id, status="failed", error=str(e))
+
+    finally:
+        with _lock:
+            _scheduled.discard(job_id)
+
+
+def schedule_job(job_id: str) -> bool:
+    with _lock:
+        if job_id in _scheduled:
+            return True
+        if len(_scheduled) >= JOB_MAX_PENDING:
+            return False
+        _scheduled.add(job_id)
+
+    _executor.submit(run_job, job_id)
+    return True
+
+
+def cleanup_jobs() -> None:
+    removed = purge_expired_jobs()
+    if removed:
+        logger.info(f"{removed} trabajos vencidos eliminados")
+
+
+def resume_jobs() -> int:
+    # ? Jobs interrupted by a restart continue from their last stored page
+    cleanup_jobs()
+    jobs = list_active_jobs()
+    for job in jobs:
+        logger.info(
+            f"Reanudando trabajo {job['id']} "
+            f"({job['completed_pages']}/{job['total_pages']} páginas)"
+        )
+        schedule_job(job["id"])
+    return len(jobs)
+
+
+def shutdown_jobs() -> None:
+    _executor.shutdown(wait=False, cancel_futures=True)
+
+
+def job_summary(job: dict) -> dict:
+    return {
+        "job_id": job["id"],
+        "kind": job["kind"],
+        "status": job["status"],
+        "total_pages": job["total_pages"],
+        "completed_pages": job["completed_pages"],
+        "progress": (
+            job["completed_pages"] / job["total_pages"] if job["total_pages"] else 1.0
+        ),
+        "error": job["error"],
+        "failed_pages": sorted(int(index) for index in job.get("page_errors", {})),
+        "page_errors": job.get("page_errors", {}),
+    }
+
+
+def submit_job_service(kind: str, files: List[UploadFile], params: dict):
+    try:
+        for file in files:
+            validate_file_extension(file.filename)
+            validate_file_size(file)
+    except HTTPException as e:
+        return error_response(e.detail, status_code=e.status_code)
+
+    with _lock:
+        if len(_scheduled) >= JOB_MAX_PENDING:
+            return error_response(Messages.JOB_QUEUE_FULL, status_code=503)
+
+    cleanup_jobs()
+    try:
+        job = create_job(kind, files, params)
+    except Exception as e:
+        return error_response(f"{Messages.IMAGE_UPLOAD_ERROR}: {e}", status_code=500)
+
+    if not schedule_job(job["id"]):
+        update_job(job["id"], status="failed", error=Messages.JOB_QUEUE_FULL.value)
+        return error_response(Messages.JOB_QUEUE_FULL, status_code=503)
+
+    return success_response(
+        message=Messages.JOB_CREATED, data=job_summary(job), status_code=202
+    )
+
+
+def get_job_service(job_id: str):
+    job = read_job(job_id)
+    if job is None:
+        return error_response(Messages.JOB_NOT_FOUND, status_code=404)
+
+    return success_response(message=Messages.SUCCESS_RETRIEVED, data=job_summary(job))
+
+
+def download_job_service(job_id: str):
+    job = read_job(job_id)
+    if job is None:
+        return error_response(Messages.JOB_NOT_FOUND, status_code=404)
+    if job["status"] != "done":
+        return error_response(Messages.JOB_NOT_FINISHED, status_code=409)
+
+    kind = JOB_KINDS[job["kind"]]
+    return FileResponse(
+        output_path(job_id, kind["extension"]),
+        media_type=kind["media_type"],
+        filename=f"{job_id}{kind['extension']}",
+    )
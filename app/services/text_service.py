@@ -5,6 +5,7 @@ import numpy as np
 import cv2
 import pytesseract  # ⚠️ FALTABA ESTA IMPORTACIÓN
 from PIL import Image
+from functools import partial
 from typing import List
 from datetime import datetime
 from fastapi import HTTPException, UploadFile
@@ -14,22 +15,37 @@ from fastapi.responses import FileResponse, StreamingResponse
 from app.core.utils import success_response, error_response
 from app.core.messages import Messages
 
+# Schemas
+from app.schemas.image import OutputMode, StreamFormat
+
 # Utils
-from app.utils.brf import text_to_ascii_braille, text_to_brf_file
+from app.utils.brf import (
+    text_to_ascii_braille,
+    text_to_brf_file,
+    texts_to_ascii_braille,
+)
 from app.utils.file import validate_file_extension, validate_file_size
-from app.utils.text_tools import image_text_to_text, image_text_to_segmentation
+from app.utils.render import RENDER_MEDIA_TYPE
+from app.utils.stream import streaming_pages_response
+from app.utils.text_tools import (
+    image_text_to_text,
+    image_text_to_segmentation,
+    images_text_to_text,
+)
 
 
-def upload_image_service(file: UploadFile):
+def upload_image_service(file: UploadFile, output: OutputMode = OutputMode.IMAGE):
     try:
         validate_file_extension(file.filename)
         validate_file_size(file)
 
-        img_bytes = image_text_to_segmentation(
-            file, conf_threshold=0.001, confidence_threshold=30
+        result = image_text_to_segmentation(
+            file, conf_threshold=0.001, confidence_threshold=30, output=output
         )
+        if output == OutputMode.JSON:
+            return success_response(message=Messages.SUCCESS_OPERATION, data=result)
 
-        return StreamingResponse(img_bytes, media_type="image/jpeg")
+        return StreamingResponse(result, media_type=RENDER_MEDIA_TYPE)
 
     except Exception as e:
         return {"error": f"Error procesando imagen: {e}"}
@@ -67,35 +83,32 @@ def upload_batch_images_service(
     confidence_threshold: int = 30,
     lang: str = "spa",
 ):
-    text = ""
-    results = ""
-    successful_uploads = 0
+    valid_files = []
     failed_uploads = 0
 
     for file in files:
         try:
             validate_file_extension(file.filename)
             validate_file_size(file)
-            text_converted = image_text_to_text(
-                file,
-                conf_threshold=conf_threshold,
-                confidence_threshold=confidence_threshold,
-                lang=lang,
-            )
-
-            results += f"{text_to_ascii_braille(text_converted)}\n"
-            text += f"{text_converted}\n"
-
-            successful_uploads += 1
+            valid_files.append(file)
 
         except HTTPException as e:
             failed_uploads += 1
 
-        except Exception as e:
-            failed_uploads += 1
-            return error_response(
-                f"{Messages.IMAGE_UPLOAD_ERROR}: {e}", status_code=500
-            )
+    try:
+        texts_converted = images_text_to_text(
+            valid_files,
+            conf_threshold=conf_threshold,
+            confidence_threshold=confidence_threshold,
+            lang=lang,
+        )
+        brailles = texts_to_ascii_braille(texts_converted)
+
+    except Exception as e:
+        return error_response(f"{Messages.IMAGE_UPLOAD_ERROR}: {e}", status_code=500)
+
+    text = "".join(f"{text_converted}\n" for text_converted in texts_converted)
+    results = "".join(f"{braille}\n" for braille in brailles)
 
     return success_response(
         message=Messages.IMAGE_UPLOAD_BATCH_SUCCESS,
@@ -103,35 +116,70 @@ def upload_batch_images_service(
             "text": text,
             "braille": results,
             "total_files": len(files),
-            "successful_uploads": successful_uploads,
+            "successful_uploads": len(texts_converted),
             "failed_uploads": failed_uploads,
         },
         status_code=207,
     )
 
 
-def upload_batch_images_to_brf(
+def text_page_to_braille(
+    file: UploadFile,
+    conf_threshold: float = 0.001,
+    confidence_threshold: int = 30,
+    lang: str = "spa",
+) -> dict:
+    validate_file_extension(file.filename)
+    validate_file_size(file)
+    text = image_text_to_text(
+        file,
+        conf_threshold=conf_threshold,
+        confidence_threshold=confidence_threshold,
+        lang=lang,
+    )
+    return {"text": text, "braille": text_to_ascii_braille(text)}
+
+
+def stream_batch_images_service(
     files: List[UploadFile],
     conf_threshold: float = 0.001,
     confidence_threshold: int = 30,
     lang: str = "spa",
+    fmt: StreamFormat = StreamFormat.NDJSON,
 ):
-    text = ""
+    return streaming_pages_response(
+        files,
+        partial(
+            text_page_to_braille,
+            conf_threshold=conf_threshold,
+            confidence_threshold=confidence_threshold,
+            lang=lang,
+        ),
+        fmt.value,
+    )
 
-    for file in files:
-        try:
+
+def upload_batch_images_to_brf(
+    files: List[UploadFile],
+    conf_threshold: float = 0.001,
+    confidence_threshold: int = 30,
+    lang: str = "spa",
+):
+    try:
+        for file in files:
             validate_file_extension(file.filename)
             validate_file_size(file)
-            text_converted = image_text_to_text(
-                file,
-                conf_threshold=conf_threshold,
-                confidence_threshold=confidence_threshold,
-                lang=lang,
-            )
-            text += f"{text_converted}\n"
-
-        except Exception as e:
-            return error_response(f"{Messages.EXCEPTION_DEFAULT}: {e}", status_code=500)
+
+        texts_converted = images_text_to_text(
+            files,
+            conf_threshold=conf_threshold,
+            confidence_threshold=confidence_threshold,
+            lang=lang,
+        )
+        text = "".join(f"{text_converted}\n" for text_converted in texts_converted)
+
+    except Exception as e:
+        return error_response(f"{Messages.EXCEPTION_DEFAULT}: {e}", status_code=500)
 
     current_date = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
     brf_bytes = text_to_brf_file(text)
@@ -1,5 +1,6 @@
 # diagnosticar_modelo.py
-from app.models.predictor_text import run_model_prediction_text
+from app.models.raw import apply_nms, predict_raw
+from app.models.registry import get_model
 import cv2
 import numpy as np
 from PIL import Image
@@ -8,20 +9,23 @@ from PIL import Image
 def diagnosticar_imagen(imagen_path):
     print(f"🔍 Diagnosticando: {imagen_path}")
 
+    # El modelo se ejecuta una sola vez; cada umbral solo repite el NMS
+    model = get_model("text")
+    imagen = cv2.imread(imagen_path)
+    [raw] = predict_raw(model, [imagen])
+
     # Probar con diferentes umbrales
     umbrales = [0.15, 0.1, 0.05, 0.01, 0.001]
 
     for conf in umbrales:
-        results = run_model_prediction_text(
-            imagen_path, conf_threshold=conf, iou_threshold=0.15
-        )
+        result = apply_nms(model, raw, imagen, conf, 0.15)
 
-        num_detecciones = len(results[0].boxes) if results[0].boxes else 0
+        num_detecciones = len(result.boxes) if result.boxes else 0
         print(f"   Umbral {conf}: {num_detecciones} detecciones")
 
         if num_detecciones > 0:
             # Mostrar detalles de las detecciones
-            for i, box in enumerate(results[0].boxes):
+            for i, box in enumerate(result.boxes):
                 cls_idx = int(box.cls.cpu().numpy())
                 conf_val = float(box.conf.cpu())
                 print(f"      - Detección {i+1}: Clase={cls_idx}, Conf={conf_val:.4f}")
@@ -0,0 +1,282 @@
+import ctypes.util
+import shutil
+
+import pytest
+
+from app.utils import brf
+from app.utils.cache import ResultCache
+
+
+@pytest.fixture
+def fake_louis(monkeypatch):
+    # ? Stand-in for lou_translate: same line framing, upper case as "braille"
+    calls = []
+
+    def run_lou_translate(text, table=brf.BRAILLE_TABLE, display_table=None):
+        calls.append(text)
+        return "".join(f"{line.upper()}\n" for line in brf.split_lines(text))
+
+    monkeypatch.setattr(brf, "load_liblouis", lambda: None)
+    monkeypatch.setattr(brf, "run_lou_translate", run_lou_translate)
+    monkeypatch.setattr(brf, "translation_cache", ResultCache("test"))
+    return calls
+
+
+def test_texts_to_ascii_braille_keeps_one_result_per_text(fake_louis):
+    texts = ["hola", "  dos   palabras ", "", "línea\nrota", "\t"]
+
+    assert brf.texts_to_ascii_braille(texts) == [
+        "HOLA",
+        "DOS PALABRAS",
+        "",
+        "LÍNEA ROTA",
+        "",
+    ]
+
+
+def test_texts_to_ascii_braille_empty(fake_louis):
+    assert brf.texts_to_ascii_braille([]) == []
+    assert fake_louis == []
+
+
+LIBLOUIS = ctypes.util.find_library("louis") and shutil.which("lou_translate")
+
+CORPUS = [
+    "Hola mundo",
+    "El niño comió 3,5 kg de AZÚCAR.\nSegunda línea",
+    "\n\nlíneas vacías\n\n",
+    "espacios   múltiples\ty tabulador ",
+    "MAYÚSCULAS SEGUIDAS EN UNA FRASE",
+    "números 10 20 30 y 1.000,5",
+    "¿Qué? ¡Sí! (paréntesis) «comillas»",
+    "",
+]
+
+
+@pytest.mark.skipif(not LIBLOUIS, reason="liblouis no instalado")
+@pytest.mark.parametrize("display_table", [None, brf.DISPLAY_TABLE])
+@pytest.mark.parametrize("text", CORPUS)
+def test_ctypes_matches_lou_translate(monkeypatch, text, display_table):
+    monkeypatch.setattr(brf, "LOUIS_ENGINE", "ctypes")
+    monkeypatch.setattr(brf, "translation_cache", ResultCache("test"))
+
+    expected = brf.run_lou_translate(text, brf.BRAILLE_TABLE, display_table)
+
+    assert brf.translate(text, brf.BRAILLE_TABLE, display_table) == expected
+
+
+def test_ctypes_engine_does_not_fall_back(fake_louis, monkeypatch):
+    def broken_line(line, table, display_table):
+        raise RuntimeError("tabla inválida")
+
+    monkeypatch.setattr(brf, "load_liblouis", lambda: object())
+    monkeypatch.setattr(brf, "_louis_translate_line", broken_line)
+
+    monkeypatch.setattr(brf, "LOUIS_ENGINE", "ctypes")
+    with pytest.raises(RuntimeError):
+        brf.translate("hola", "otra.ctb")
+    assert fake_louis == []
+
+    monkeypatch.setattr(brf, "LOUIS_ENGINE", "auto")
+    assert brf.translate("hola", "otra.ctb") == "HOLA\n"
+
+
+def test_empty_text_translates_to_nothing(fake_louis):
+    assert brf.translate("") == ""
+    assert brf.translate("\n") == "\n"
+
+
+def test_remap_positions_for_utf16_surrogates():
+    # ? "a😀b" is four UTF-16 units; liblouis reports positions in those units
+    output_pos, input_pos = brf.remap_positions(
+        "a😀b", "wxyz", [0, 1, 2, 3], [0, 1, 2, 3], "utf-16-le"
+    )
+    assert output_pos == [0, 1, 3]
+    assert input_pos == [0, 1, 1, 2]
+
+    # ? Braille outside the BMP: two units per output character
+    output_pos, input_pos = brf.remap_positions(
+        "ab", "𝐀b", [0, 2], [0, 0, 1], "utf-16-le"
+    )
+    assert output_pos == [0, 1]
+    assert input_pos == [0, 1]
+
+
+def test_remap_positions_is_identity_without_surrogates():
+    assert brf.remap_positions("año", "xyz", [0, 1, 2], [0, 1, 2], "utf-16-le") == (
+        [0, 1, 2],
+        [0, 1, 2],
+    )
+    assert brf.remap_positions("a😀", "xy", [0, 1], [0, 1], "utf-32-le") == (
+        [0, 1],
+        [0, 1],
+    )
+
+
+def indicator_translation(text):
+    # ? Capital and number signs are extra cells mapped to the character they mark
+    braille, input_pos = "", []
+    for position, char in enumerate(text):
+        cells = ("^" if char.isupper() else "#" if char.isdigit() else "") + char
+        braille += cells.lower()
+        input_pos.extend([position] * len(cells))
+    return brf.Translation(braille, None, input_pos)
+
+
+def test_split_by_words_keeps_indicators_with_their_word():
+    words = ["Hola", "MUNDO", "3,5", "kg"]
+    translation = indicator_translation(" ".join(words))
+
+    assert brf.split_by_words(translation, words) == [
+        "^hola",
+        "^m^u^n^d^o",
+        "#3,#5",
+        "kg",
+    ]
+
+
+def test_words_to_ascii_braille_uses_positions(monkeypatch):
+    monkeypatch.setattr(brf, "load_liblouis", lambda: object())
+    monkeypatch.setattr(
+        brf,
+        "translate_segments",
+        lambda segments: [indicator_translation(segment) for segment in segments],
+    )
+
+    assert brf.words_to_ascii_braille(["Año", "2024"]) == ["^año", "#2#0#2#4"]
+    assert brf.words_to_ascii_braille([]) == []
+
+
+def test_words_to_ascii_braille_without_liblouis(fake_louis):
+    assert brf.words_to_ascii_braille(["hola", "mundo"]) == ["HOLA", "MUNDO"]
+
+
+@pytest.mark.skipif(not LIBLOUIS, reason="liblouis no instalado")
+@pytest.mark.parametrize("text", ["Hola MUNDO 3,5", "niño 😀 año", "𝐀 b"])
+def test_liblouis_positions_are_str_indices(text):
+    [translation] = brf.translate_segments([text])
+
+    assert len(translation.output_pos) == len(text)
+    assert len(translation.input_pos) == len(translation.braille)
+    assert all(0 <= pos < len(text) for pos in translation.input_pos)
+    assert translation.braille == brf.text_to_ascii_braille(text)
+
+
+def test_repeated_lines_are_served_from_the_cache(fake_louis):
+    text = "hola\nmundo\nhola\n\nmundo"
+
+    assert brf.translate(text) == "HOLA\nMUNDO\nHOLA\n\nMUNDO\n"
+    assert fake_louis == ["hola\nmundo\n"]
+
+    assert brf.translate("mundo\nhola\n") == "MUNDO\nHOLA\n"
+    assert len(fake_louis) == 1
+    assert brf.translation_cache.stats()["hits"] == 2
+
+
+def test_cache_is_keyed_by_display_table(fake_louis):
+    brf.translate("hola", brf.BRAILLE_TABLE)
+    brf.translate("hola", brf.BRAILLE_TABLE, brf.DISPLAY_TABLE)
+
+    assert len(fake_louis) == 2
+
+
+def test_words_are_memoized_across_lines(fake_louis):
+    assert brf.translate("hola mundo") == "HOLA MUNDO\n"
+    assert brf.translate("mundo  hola\nhola") == "MUNDO  HOLA\nHOLA\n"
+
+    assert fake_louis == ["hola\n \nmundo\n", "  \n"]
+
+
+def test_other_tables_are_memoized_per_line(fake_louis):
+    brf.translate("hola mundo", "otra.ctb")
+    brf.translate("mundo hola", "otra.ctb")
+
+    assert fake_louis == ["hola mundo\n", "mundo hola\n"]
+
+
+def test_long_units_are_not_cached(fake_louis, monkeypatch):
+    monkeypatch.setattr(brf, "CACHE_MAX_CHARS", 10)
+    long_word = "electroencefalografista"
+
+    assert brf.translate(long_word) == f"{long_word.upper()}\n"
+    assert brf.translate(long_word) == f"{long_word.upper()}\n"
+    assert len(fake_louis) == 2
+    assert brf.translation_cache.stats()["items"] == 0
+
+
+PAGES = [
+    " ".join(
+        [
+            "El niño y la niña leen el libro de la escuela en la biblioteca de la",
+            "ciudad. La maestra lee en voz alta y los niños escuchan con atención;",
+            "después la clase escribe en el cuaderno las palabras nuevas del libro",
+            "y la maestra corrige los cuadernos de la clase en la biblioteca.",
+        ]
+    ),
+    " ".join(
+        [
+            "Al día siguiente la clase vuelve a la biblioteca de la escuela y la",
+            "maestra pide a los niños que lean en voz alta las palabras del libro",
+            "que escribieron en el cuaderno, y la niña lee la primera de la lista.",
+        ]
+    ),
+]
+PAGE = PAGES[0]
+
+
+def test_realistic_pages_hit_the_word_cache(fake_louis):
+    # ? A whole OCR page is one long line; later pages reuse most of its words
+    assert all(len(page) > 200 for page in PAGES)
+
+    for page in PAGES:
+        assert brf.translate(page) == f"{page.upper()}\n"
+
+    first, second = (set(brf.split_units(page, brf.BRAILLE_TABLE)) for page in PAGES)
+    stats = brf.translation_cache.stats()
+    assert stats["hits"] == len(first & second) > 0
+    assert stats["items"] == len(first | second)
+
+
+def test_overlay_words_are_memoized(monkeypatch):
+    segments = []
+
+    def translate_segments(batch):
+        segments.extend(batch)
+        return [indicator_translation(segment) for segment in batch]
+
+    monkeypatch.setattr(brf, "translation_cache", ResultCache("test"))
+    monkeypatch.setattr(brf, "load_liblouis", lambda: object())
+    monkeypatch.setattr(brf, "translate_segments", translate_segments)
+
+    assert brf.words_to_ascii_braille(["Año", "2024"]) == ["^año", "#2#0#2#4"]
+    assert brf.words_to_ascii_braille(["2024", "sol", "Año"]) == [
+        "#2#0#2#4",
+        "sol",
+        "^año",
+    ]
+    assert segments == ["Año 2024", "sol"]
+
+
+@pytest.mark.skipif(not LIBLOUIS, reason="liblouis no instalado")
+@pytest.mark.parametrize("display_table", [None, brf.DISPLAY_TABLE])
+@pytest.mark.parametrize("text", CORPUS + [PAGE])
+def test_memoized_translation_matches_lou_translate(monkeypatch, text, display_table):
+    # ? Word-by-word memoization must equal translating the whole line
+    monkeypatch.setattr(brf, "translation_cache", ResultCache("test"))
+    expected = brf.run_lou_translate(text, brf.BRAILLE_TABLE, display_table)
+
+    assert brf.translate(text, brf.BRAILLE_TABLE, display_table) == expected
+    assert brf.translate(text, brf.BRAILLE_TABLE, display_table) == expected
+
+
+@pytest.mark.skipif(not LIBLOUIS, reason="liblouis no instalado")
+@pytest.mark.parametrize("text", CORPUS + [PAGE])
+def test_memoized_words_match_the_split_translation(monkeypatch, text):
+    monkeypatch.setattr(brf, "translation_cache", ResultCache("test"))
+    words = text.split()
+
+    expected = brf.split_by_words(brf.translate_segments([" ".join(words)])[0], words)
+
+    # ? Second call is served from the words cached by the translation above
+    brf.text_to_ascii_braille(text)
+    assert brf.words_to_ascii_braille(words) == expected
@@ -0,0 +1,100 @@
+import threading
+import time
+
+import pytest
+
+from app.utils import cache as cache_module
+from app.utils.cache import MISSING, ResultCache, cache_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: now[0])
+    return now
+
+
+def test_cache_key_is_stable_and_distinguishes_parts():
+    assert cache_key("a", 1, None) == cache_key("a", 1, None)
+    assert cache_key("a", 1, None) != cache_key("a", 1, 0)
+
+
+def test_ttl_expires_entries(clock):
+    cache = ResultCache("test", ttl=10)
+    cache.put("key", "value")
+
+    clock[0] += 9
+    assert cache.get("key") == "value"
+
+    clock[0] += 2
+    assert cache.get("key") is MISSING
+    assert cache.stats()["items"] == 0
+
+
+def test_lru_evicts_least_recently_used():
+    cache = ResultCache("test", max_items=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_disk_tier_survives_a_new_instance(tmp_path, clock):
+    ResultCache("test", ttl=10, disk_path=str(tmp_path)).put("key", "value")
+
+    cache = ResultCache("test", ttl=10, disk_path=str(tmp_path))
+    assert cache.get("key") == "value"
+    assert cache.stats()["disk_hits"] == 1
+
+    clock[0] += 11
+    assert ResultCache("test", disk_path=str(tmp_path)).get("key") is MISSING
+
+
+def test_concurrent_identical_requests_compute_once():
+    cache = ResultCache("test")
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "value"
+
+    results = []
+    owner = threading.Thread(
+        target=lambda: results.append(cache.get_or_compute("key", compute))
+    )
+    owner.start()
+    started.wait(5)
+
+    waiter = threading.Thread(
+        target=lambda: results.append(cache.get_or_compute("key", compute))
+    )
+    waiter.start()
+    for _ in range(500):
+        if cache.stats()["coalesced"]:
+            break
+        time.sleep(0.01)
+    release.set()
+    owner.join(5)
+    waiter.join(5)
+
+    assert results == ["value", "value"]
+    assert len(calls) == 1
+
+
+def test_failed_compute_is_not_cached():
+    cache = ResultCache("test")
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        cache.get_or_compute("key", fail)
+    assert cache.get_or_compute("key", lambda: "ok") == "ok"
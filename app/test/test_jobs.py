@@ -0,0 +1,85 @@
+import io
+import os
+import time
+
+import pytest
+from fastapi import UploadFile
+
+from app.services import job_service
+from app.utils import jobs
+
+
+@pytest.fixture
+def jobs_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, "JOBS_PATH", str(tmp_path))
+    return tmp_path
+
+
+def uploads(*names):
+    return [UploadFile(file=io.BytesIO(name.encode()), filename=name) for name in names]
+
+
+def fake_convert(kind, files, params):
+    texts = []
+    for file in files:
+        content = file.file.read().decode()
+        if content.startswith("bad"):
+            raise RuntimeError(f"no se pudo leer {content}")
+        texts.append(content.upper())
+    return texts
+
+
+def test_bad_page_is_recorded_without_failing_the_job(jobs_path, monkeypatch):
+    monkeypatch.setattr(job_service, "convert_pages", fake_convert)
+    monkeypatch.setattr(job_service, "JOB_CHUNK_SIZE", 2)
+    job = jobs.create_job("text-brf", uploads("a.png", "bad.png", "c.png"), {})
+    rendered = []
+    monkeypatch.setattr(
+        job_service,
+        "render_output",
+        lambda kind, text: rendered.append(text) or io.BytesIO(),
+    )
+
+    job_service.run_job(job["id"])
+
+    summary = job_service.job_summary(jobs.read_job(job["id"]))
+    assert summary["status"] == "done"
+    assert summary["completed_pages"] == 3
+    assert summary["failed_pages"] == [1]
+    assert "bad.png" in summary["page_errors"]["1"]
+    assert rendered == ["A.PNG\n\nC.PNG\n"]
+
+
+def test_job_fails_when_every_page_fails(jobs_path, monkeypatch):
+    monkeypatch.setattr(job_service, "convert_pages", fake_convert)
+    job = jobs.create_job("text-brf", uploads("bad1.png", "bad2.png"), {})
+
+    job_service.run_job(job["id"])
+
+    assert jobs.read_job(job["id"])["status"] == "failed"
+
+
+def test_purge_removes_only_expired_finished_jobs(jobs_path):
+    old_done = jobs.create_job("text-brf", uploads("a.png"), {})
+    jobs.update_job(old_done["id"], status="done")
+    new_done = jobs.create_job("text-brf", uploads("a.png"), {})
+    jobs.update_job(new_done["id"], status="done")
+    running = jobs.create_job("text-brf", uploads("a.png"), {})
+    jobs.update_job(running["id"], status="running")
+    orphan = jobs_path / "orphan"
+    orphan.mkdir()
+
+    past = time.time() - 7200
+    jobs._write_json(
+        jobs._meta_path(old_done["id"]),
+        {**jobs.read_job(old_done["id"]), "updated_at": past},
+    )
+    jobs._write_json(
+        jobs._meta_path(running["id"]),
+        {**jobs.read_job(running["id"]), "updated_at": past},
+    )
+    os.utime(orphan, (past, past))
+
+    assert jobs.purge_expired_jobs(ttl=3600) == 2
+    assert sorted(os.listdir(jobs_path)) == sorted([new_done["id"], running["id"]])
+    assert jobs.purge_expired_jobs(ttl=0) == 0
@@ -0,0 +1,37 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.utils import ocr
+
+
+def test_image_to_data_respects_the_shared_slots(monkeypatch):
+    running, peak = [0], [0]
+    lock = threading.Lock()
+
+    def fake_image_to_data(image, lang, psm):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.01)
+        with lock:
+            running[0] -= 1
+        return {}
+
+    monkeypatch.setattr(ocr, "_image_to_data", fake_image_to_data)
+    monkeypatch.setattr(ocr, "_slots", threading.BoundedSemaphore(2))
+
+    image = np.zeros((8, 8), dtype=np.uint8)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: ocr.image_to_data(image), range(16)))
+
+    assert peak[0] == 2
+
+
+def test_budget_is_consistent():
+    budget = ocr.ocr_budget()
+
+    assert budget["slots"] == max(1, budget["threads"] // budget["threads_per_page"])
+    assert budget["page_workers"] >= 1
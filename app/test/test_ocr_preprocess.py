@@ -0,0 +1,88 @@
+import cv2
+import numpy as np
+
+from app.utils import ocr_preprocess
+from app.utils.frame import Frame
+from app.utils.ocr_preprocess import OcrParams, boxes_to_original
+
+BOXES = np.array([[40, 30, 25, 12], [300, 200, 60, 18]])
+
+
+def forward(boxes, params):
+    # ? Original pixels -> normalized image, the way normalize_for_ocr warps
+    x1, y1 = boxes[:, 0].astype(float), boxes[:, 1].astype(float)
+    x2, y2 = x1 + boxes[:, 2], y1 + boxes[:, 3]
+    if params.crop:
+        x1, x2 = x1 - params.crop[0], x2 - params.crop[0]
+        y1, y2 = y1 - params.crop[1], y2 - params.crop[1]
+    if params.rotation is not None:
+        corners = np.stack(
+            [
+                np.stack([x1, y1], axis=1),
+                np.stack([x2, y1], axis=1),
+                np.stack([x1, y2], axis=1),
+                np.stack([x2, y2], axis=1),
+            ],
+            axis=1,
+        )
+        mapped = corners @ params.rotation[:, :2].T + params.rotation[:, 2]
+        x1, y1 = mapped[..., 0].min(axis=1), mapped[..., 1].min(axis=1)
+        x2, y2 = mapped[..., 0].max(axis=1), mapped[..., 1].max(axis=1)
+    x1, y1, x2, y2 = (v * params.scale for v in (x1, y1, x2, y2))
+    return np.stack([x1, y1, x2 - x1, y2 - y1], axis=1)
+
+
+def centers(boxes):
+    return boxes[:, :2] + boxes[:, 2:] / 2
+
+
+def test_identity_params_keep_boxes():
+    np.testing.assert_array_equal(boxes_to_original(BOXES, OcrParams()), BOXES)
+
+
+def test_scale_and_crop_round_trip():
+    params = OcrParams(scale=0.25, crop=(16, 8, 800, 600))
+
+    restored = boxes_to_original(forward(BOXES, params), params)
+
+    np.testing.assert_allclose(restored, BOXES, atol=1)
+
+
+def test_rotation_round_trip_keeps_the_word_inside():
+    crop = (10, 10, 700, 500)
+    rotation = cv2.getRotationMatrix2D((345, 245), 4.0, 1.0)
+    params = OcrParams(scale=1.5, angle=4.0, crop=crop, rotation=rotation)
+
+    restored = boxes_to_original(forward(BOXES, params), params)
+
+    np.testing.assert_allclose(centers(restored), centers(BOXES), atol=1)
+    assert (restored[:, :2] <= BOXES[:, :2] + 1).all()
+    assert (restored[:, :2] + restored[:, 2:] >= BOXES[:, :2] + BOXES[:, 2:] - 1).all()
+
+
+def test_disabled_normalization_is_the_previous_denoise(monkeypatch):
+    monkeypatch.setattr(ocr_preprocess, "NORMALIZE", False)
+    monkeypatch.setattr(ocr_preprocess, "BINARIZE", False)
+    image = np.random.default_rng(0).integers(0, 255, (120, 160, 3), dtype=np.uint8)
+    frame = Frame("page.png", image)
+
+    normalized, params = ocr_preprocess.normalize_for_ocr(frame)
+
+    assert params == OcrParams()
+    np.testing.assert_array_equal(normalized, cv2.medianBlur(frame.gray, 3))
+
+
+def test_estimate_params_scales_large_text_down(monkeypatch):
+    monkeypatch.setattr(ocr_preprocess, "CROP", True)
+    page = np.full((1000, 1400), 255, dtype=np.uint8)
+    for row in range(5):
+        for col in range(20):
+            x, y = 100 + col * 55, 150 + row * 140
+            cv2.rectangle(page, (x, y), (x + 30, y + 80), 0, thickness=8)
+    frame = Frame("page.png", cv2.cvtColor(page, cv2.COLOR_GRAY2BGR))
+
+    params = ocr_preprocess.estimate_params(frame)
+
+    assert 0.2 <= params.scale < 0.8
+    x1, y1, x2, y2 = params.crop
+    assert x1 <= 100 and y1 <= 150 and x2 >= 1175 and y2 >= 790
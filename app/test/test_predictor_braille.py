@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("ultralytics")
+
+from app.models import predictor_braille
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = {"batches": [], "microbatched": 0}
+
+    def run_batch(images, imgsz=None):
+        calls["batches"].append(len(images))
+        return [object() for _ in images]
+
+    def predict(image):
+        calls["microbatched"] += 1
+        return object()
+
+    monkeypatch.setattr(predictor_braille, "MICROBATCH", True)
+    monkeypatch.setattr(predictor_braille, "run_model_raw_batch", run_batch)
+    monkeypatch.setattr(predictor_braille.batcher, "predict", predict)
+    return calls
+
+
+IMAGE = np.zeros((32, 32, 3), dtype=np.uint8)
+
+
+def test_single_frames_go_through_the_micro_batcher(calls):
+    predictor_braille.run_model_raw([IMAGE])
+
+    assert calls == {"batches": [], "microbatched": 1}
+
+
+def test_batches_bypass_the_micro_batcher(calls):
+    raws = predictor_braille.run_model_raw([IMAGE] * 20, batch_size=16)
+
+    assert len(raws) == 20
+    assert calls == {"batches": [16, 4], "microbatched": 0}
+
+
+def test_reduced_imgsz_bypasses_the_micro_batcher(calls):
+    predictor_braille.run_model_raw([IMAGE], imgsz=320)
+
+    assert calls == {"batches": [1], "microbatched": 0}
@@ -0,0 +1,103 @@
+import os
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("ultralytics")
+
+from app.models.raw import RawPrediction, apply_nms, predict_raw
+from app.models.registry import model_path
+
+ASSETS = os.path.join(os.path.dirname(__file__), "..", "..", "test", "k6", "assets")
+
+
+class FakeModel:
+    names = {i: str(i) for i in range(4)}
+
+
+IMAGE = np.zeros((1280, 960, 3), dtype=np.uint8)
+
+
+def random_raw(seed: int, anchors: int = 400) -> RawPrediction:
+    generator = torch.Generator().manual_seed(seed)
+    xy = torch.rand(2, anchors, generator=generator) * 600 + 20
+    wh = torch.rand(2, anchors, generator=generator) * 30 + 10
+    scores = torch.rand(len(FakeModel.names), anchors, generator=generator)
+    preds = torch.cat([xy, wh, scores]).unsqueeze(0)
+    return RawPrediction(preds, (640, 640), (1280, 960))
+
+
+def boxes_of(result) -> np.ndarray:
+    return result.boxes.data.cpu().numpy()
+
+
+def test_apply_nms_leaves_cached_output_untouched():
+    raw = random_raw(0)
+    before = raw.preds.clone()
+
+    apply_nms(FakeModel(), raw, IMAGE, 0.3, 0.5)
+
+    assert torch.equal(raw.preds, before)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_refiltering_matches_a_fresh_prediction(seed):
+    # ? A cached raw output re-thresholded must equal a never-used one
+    cached, fresh = random_raw(seed), random_raw(seed)
+
+    apply_nms(FakeModel(), cached, IMAGE, 0.6, 0.3)
+    refiltered = apply_nms(FakeModel(), cached, IMAGE, 0.2, 0.5)
+    direct = apply_nms(FakeModel(), fresh, IMAGE, 0.2, 0.5)
+
+    np.testing.assert_array_equal(boxes_of(refiltered), boxes_of(direct))
+
+
+def load_model_and_image():
+    import cv2
+    from ultralytics import YOLO
+
+    # ? Untrained weights still exercise the same pre/post-processing
+    path = model_path("braille", "torch", "fp32")
+    model = YOLO(path if os.path.exists(path) else "yolov8n.yaml", task="detect")
+    conf = 0.15 if os.path.exists(path) else 1e-5
+    image = cv2.imread(os.path.join(ASSETS, "braille_basic.jpg"))
+    return model, conf, image
+
+
+def test_matches_ultralytics_predict():
+    model, conf, image = load_model_and_image()
+
+    expected = model.predict(source=image, conf=conf, iou=0.15, verbose=False)[0]
+    [raw] = predict_raw(model, [image])
+    actual = apply_nms(model, raw, image, conf, 0.15)
+
+    assert len(boxes_of(expected)) > 0
+    np.testing.assert_allclose(boxes_of(actual), boxes_of(expected), atol=1e-3)
+
+
+def test_reduced_imgsz_returns_original_coordinates():
+    # ? The cascade's cheap pass: letterbox to 320 and scale boxes back
+    model, conf, image = load_model_and_image()
+
+    [raw] = predict_raw(model, [image], imgsz=300)
+    actual = apply_nms(model, raw, image, conf, 0.15)
+    expected = model.predict(
+        source=image, conf=conf, iou=0.15, imgsz=320, verbose=False
+    )[0]
+
+    assert max(raw.input_shape) == 320
+    assert raw.orig_shape == image.shape[:2]
+    assert len(boxes_of(expected)) > 0
+    np.testing.assert_allclose(boxes_of(actual), boxes_of(expected), atol=1e-3)
+    assert boxes_of(actual)[:, [0, 2]].max() > 320
+
+
+def test_each_prediction_owns_its_storage():
+    # ? Cached entries must not pin the output of the rest of their batch
+    model, _, image = load_model_and_image()
+
+    raws = predict_raw(model, [image, image[::2, ::2], image[:, ::-1]])
+
+    sizes = {raw.preds.untyped_storage().nbytes() for raw in raws}
+    assert sizes == {raws[0].preds.numel() * raws[0].preds.element_size()}
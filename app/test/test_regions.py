@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from app.utils.regions import merge_boxes, pad_boxes, reading_order
+
+
+def reference_merge_boxes(boxes, gap_x, gap_y):
+    # ? Dense all-pairs version: obviously right, quadratic
+    boxes = boxes.astype(np.float64)
+    x1, y1 = boxes[:, 0] - gap_x, boxes[:, 1] - gap_y
+    x2, y2 = boxes[:, 2] + gap_x, boxes[:, 3] + gap_y
+    adjacency = (
+        (x1[:, None] <= x2[None, :])
+        & (x1[None, :] <= x2[:, None])
+        & (y1[:, None] <= y2[None, :])
+        & (y1[None, :] <= y2[:, None])
+    )
+
+    labels = np.full(len(boxes), -1)
+    for seed in range(len(boxes)):
+        if labels[seed] >= 0:
+            continue
+        labels[seed] = seed
+        stack = [seed]
+        while stack:
+            neighbours = np.flatnonzero(adjacency[stack.pop()] & (labels < 0))
+            labels[neighbours] = seed
+            stack.extend(neighbours.tolist())
+
+    return {
+        tuple(
+            np.round(
+                [
+                    boxes[labels == label, 0].min(),
+                    boxes[labels == label, 1].min(),
+                    boxes[labels == label, 2].max(),
+                    boxes[labels == label, 3].max(),
+                ]
+            ).astype(int)
+        )
+        for label in np.unique(labels)
+    }
+
+
+def random_boxes(rng, n):
+    x = rng.uniform(0, 2000, n)
+    y = rng.uniform(0, 2800, n)
+    w = rng.uniform(5, 40, n)
+    h = rng.uniform(10, 30, n)
+    return np.stack([x, y, x + w, y + h], axis=1).round().astype(np.int32)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_merge_boxes_matches_dense_reference(seed):
+    rng = np.random.default_rng(seed)
+    boxes = random_boxes(rng, int(rng.integers(1, 600)))
+
+    merged = merge_boxes(boxes, gap_x=20, gap_y=4)
+
+    assert {tuple(region) for region in merged.tolist()} == reference_merge_boxes(
+        boxes, 20, 4
+    )
+
+
+def test_merge_boxes_joins_a_text_line():
+    boxes = np.array([[0, 0, 10, 20], [12, 1, 22, 21], [100, 0, 110, 20]])
+
+    merged = merge_boxes(boxes, gap_x=5, gap_y=2)
+
+    assert sorted(merged.tolist()) == [[0, 0, 22, 21], [100, 0, 110, 20]]
+
+
+def test_merge_boxes_empty():
+    assert merge_boxes(np.empty((0, 4)), 1, 1).shape == (0, 4)
+
+
+def test_dense_page_stays_linear_in_lines():
+    # ? 60 lines x 100 characters; the old dense matrix needed 36M cells
+    xs = np.arange(100) * 12
+    ys = np.arange(60) * 40
+    x, y = np.meshgrid(xs, ys)
+    boxes = np.stack(
+        [x.ravel(), y.ravel(), x.ravel() + 10, y.ravel() + 20], axis=1
+    ).astype(np.int32)
+
+    merged = merge_boxes(boxes, gap_x=10, gap_y=4)
+
+    assert len(merged) == 60
+
+
+def test_pad_and_reading_order():
+    boxes = np.array([[50, 100, 80, 120], [0, 0, 20, 20], [30, 2, 60, 22]])
+
+    assert pad_boxes(boxes, 5, 70, 110).tolist() == [
+        [45, 95, 70, 110],
+        [0, 0, 25, 25],
+        [25, 0, 65, 27],
+    ]
+    assert reading_order(boxes, line_height=20).tolist() == [1, 2, 0]
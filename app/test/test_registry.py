@@ -0,0 +1,33 @@
+import pytest
+
+pytest.importorskip("ultralytics")
+
+from app.models import registry
+
+
+@pytest.fixture
+def status(monkeypatch):
+    status = {name: registry.STATUS_PENDING for name in registry.MODEL_FILES}
+    monkeypatch.setattr(registry, "_status", status)
+    monkeypatch.setattr(registry, "SERVED_MODELS", ["braille"])
+    return status
+
+
+def test_ready_ignores_models_the_deployment_does_not_serve(status, monkeypatch):
+    monkeypatch.setattr(registry, "PRELOAD", True)
+    status["text"] = registry.STATUS_FAILED
+    assert not registry.is_ready()
+
+    status["braille"] = registry.STATUS_READY
+    assert registry.is_ready()
+
+    monkeypatch.setattr(registry, "SERVED_MODELS", ["braille", "text"])
+    assert not registry.is_ready()
+
+
+def test_ready_without_preload_until_a_model_fails(status, monkeypatch):
+    monkeypatch.setattr(registry, "PRELOAD", False)
+    assert registry.is_ready()
+
+    status["braille"] = registry.STATUS_FAILED
+    assert not registry.is_ready()
@@ -0,0 +1,70 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from fastapi import HTTPException
+
+from app.utils.stream import encode_record, stream_pages
+
+
+def collect(files, process_page, fmt):
+    async def run():
+        return [chunk async for chunk in stream_pages(files, process_page, fmt)]
+
+    return asyncio.run(run())
+
+
+def process_page(file):
+    if file.filename == "bad.png":
+        raise HTTPException(status_code=400, detail="Formato no permitido")
+    if file.filename == "broken.png":
+        raise ValueError("imagen corrupta")
+    return {"text": file.filename.upper()}
+
+
+FILES = [
+    SimpleNamespace(filename="a.png"),
+    SimpleNamespace(filename="bad.png"),
+    SimpleNamespace(filename="broken.png"),
+    SimpleNamespace(filename="ñ.png"),
+]
+
+
+def test_encode_record_framing():
+    assert encode_record({"a": "ñ"}) == '{"a": "ñ"}\n'.encode("utf-8")
+    assert encode_record({"a": 1}, "sse", event="done") == (
+        b'event: done\ndata: {"a": 1}\n\n'
+    )
+
+
+def test_ndjson_stream_has_one_line_per_page_and_a_summary():
+    chunks = collect(FILES, process_page, "ndjson")
+
+    assert all(chunk.endswith(b"\n") and chunk.count(b"\n") == 1 for chunk in chunks)
+    records = [json.loads(chunk) for chunk in chunks]
+    pages, summary = records[:-1], records[-1]
+
+    assert [page["index"] for page in pages] == [0, 1, 2, 3]
+    assert [page["status"] for page in pages] == [
+        "success",
+        "error",
+        "error",
+        "success",
+    ]
+    assert pages[0]["text"] == "A.PNG"
+    assert pages[1]["error"] == "Formato no permitido"
+    assert "imagen corrupta" in pages[2]["error"]
+    assert pages[3]["filename"] == "ñ.png"
+    assert summary["total_files"] == 4
+    assert summary["successful_uploads"] == 2
+    assert summary["failed_uploads"] == 2
+
+
+def test_sse_stream_events():
+    chunks = collect(FILES[:1], process_page, "sse")
+
+    events = [chunk.decode("utf-8") for chunk in chunks]
+    assert all(event.endswith("\n\n") for event in events)
+    assert events[0].startswith("event: page\ndata: ")
+    assert events[-1].startswith("event: done\ndata: ")
+    assert json.loads(events[0].split("data: ", 1)[1])["text"] == "A.PNG"
@@ -0,0 +1,31 @@
+import io
+
+import cv2
+import numpy as np
+import pytest
+from fastapi import UploadFile
+
+pytest.importorskip("ultralytics")
+
+from app.utils import text_tools
+from app.utils.cache import ResultCache
+
+
+def upload(name, data):
+    return UploadFile(file=io.BytesIO(data), filename=name)
+
+
+def test_unreadable_page_is_empty_without_failing_the_batch(monkeypatch):
+    monkeypatch.setattr(text_tools, "recognition_cache", ResultCache("test"))
+    monkeypatch.setattr(text_tools, "DETECTION_GUIDED_OCR", False)
+    monkeypatch.setattr(
+        text_tools, "extract_text", lambda frame, confidence, lang: frame.filename
+    )
+    _, png = cv2.imencode(".png", np.zeros((8, 8, 3), dtype=np.uint8))
+    files = [
+        upload("a.png", png.tobytes()),
+        upload("rota.png", b"no es una imagen"),
+        upload("c.png", png.tobytes() + b"\0"),
+    ]
+
+    assert text_tools.images_text_to_text(files) == ["a.png", "", "c.png"]
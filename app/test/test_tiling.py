@@ -0,0 +1,65 @@
+import numpy as np
+
+from app.utils.tiling import inner_edge_mask, iter_tiles, nms, tile_origins
+
+
+def test_tile_origins_cover_the_image():
+    assert tile_origins(500, 640, 128) == [0]
+    assert tile_origins(1500, 640, 128) == [0, 512, 860]
+
+    for length in (641, 1000, 1280, 4000):
+        origins = tile_origins(length, 640, 128)
+        assert origins[-1] + 640 == length
+        assert all(b - a <= 512 for a, b in zip(origins, origins[1:]))
+
+
+def test_iter_tiles_are_views():
+    image = np.zeros((1000, 1300, 3), dtype=np.uint8)
+    tiles = list(iter_tiles(image, 640, 128))
+
+    assert all(tile.shape == (640, 640, 3) for _, _, tile in tiles)
+    assert all(np.shares_memory(tile, image) for _, _, tile in tiles)
+
+
+def test_inner_edge_mask_drops_cells_cut_by_inner_borders():
+    boxes = np.array(
+        [
+            [0, 100, 20, 130],  # left border
+            [300, 0, 320, 30],  # top border
+            [625, 100, 640, 130],  # right border
+            [300, 620, 320, 640],  # bottom border
+            [300, 300, 320, 330],  # inside
+        ]
+    )
+
+    # ? Top-left tile: only its right and bottom borders are inside the image
+    keep = inner_edge_mask(boxes, 0, 0, (640, 640), (2000, 2000))
+    assert keep.tolist() == [True, True, False, False, True]
+
+    # ? Middle tile: every border is shared with a neighbour
+    keep = inner_edge_mask(boxes, 512, 512, (640, 640), (2000, 2000))
+    assert keep.tolist() == [False, False, False, False, True]
+
+    # ? Single tile covering the whole image keeps everything
+    keep = inner_edge_mask(boxes, 0, 0, (640, 640), (640, 640))
+    assert keep.all()
+
+
+def test_nms_keeps_best_of_overlapping_boxes():
+    boxes = np.array(
+        [
+            [0, 0, 20, 30],
+            [1, 1, 21, 31],  # duplicate of the first from a neighbour tile
+            [40, 0, 60, 30],
+            [41, 0, 61, 30],
+        ]
+    )
+    scores = np.array([0.6, 0.9, 0.8, 0.7])
+
+    assert sorted(nms(boxes, scores, 0.5).tolist()) == [1, 2]
+    assert sorted(nms(boxes, scores, 0.99).tolist()) == [0, 1, 2, 3]
+
+
+def test_nms_empty():
+    keep = nms(np.empty((0, 4)), np.empty(0), 0.5)
+    assert keep.dtype == np.int64 and len(keep) == 0
@@ -1,19 +1,58 @@
-import io
 import os
-import shutil
+import threading
 import numpy as np
-import cv2
-from PIL import Image
+from functools import lru_cache
 
 # Core
 from app.core.messages import Messages
 
 # Utils
-from app.utils.file import generate_unique_filename
+from app.utils.cache import (
+    MISSING,
+    cache_key,
+    raw_prediction_cache,
+    recognition_cache,
+)
+from app.utils.file import content_hash, read_upload
+from app.utils.frame import Frame
+from app.utils.render import (
+    PREVIEW_MAX_SIZE,
+    downscale,
+    draw_labeled_boxes,
+    encode_image,
+)
 from app.utils.text_format import clean_text_spell
+from app.utils.tiling import iter_tile_batches, inner_edge_mask, nms
 
 # Models
-from app.models.predictor_braille import run_model_prediction, BINARY_TO_LETTER
+from app.models.predictor_braille import (
+    filter_raw_prediction,
+    run_model_prediction_batch,
+    run_model_raw,
+    BINARY_TO_LETTER,
+    BATCH_SIZE,
+    MODEL_NAME,
+)
+from app.models.raw import MAX_DETECTIONS
+from app.models.registry import model_path
+
+# ? Opt-in tiled inference for high resolution scans
+TILING = os.getenv("BRAILLE_TILING", "false").lower() == "true"
+TILE_SIZE = int(os.getenv("BRAILLE_TILE_SIZE", "640"))
+TILE_OVERLAP = int(os.getenv("BRAILLE_TILE_OVERLAP", "128"))
+TILE_NMS_IOU = float(os.getenv("BRAILLE_TILE_NMS_IOU", "0.5"))
+
+# ? Opt-in cascade: a cheap low resolution pass, escalated to the full input
+# ? size when it finds too few cells or is not confident enough
+CASCADE = os.getenv("BRAILLE_CASCADE", "false").lower() == "true"
+CASCADE_IMGSZ = int(os.getenv("BRAILLE_CASCADE_IMGSZ", "320"))
+CASCADE_MIN_CELLS = int(os.getenv("BRAILLE_CASCADE_MIN_CELLS", "20"))
+CASCADE_MIN_CONF = float(os.getenv("BRAILLE_CASCADE_MIN_CONF", "0.5"))
+CASCADE_LOW_CONF = float(os.getenv("BRAILLE_CASCADE_LOW_CONF", "0.3"))
+CASCADE_MAX_LOW_FRACTION = float(os.getenv("BRAILLE_CASCADE_MAX_LOW_FRACTION", "0.2"))
+
+_cascade_lock = threading.Lock()
+_cascade_stats = {"cheap": 0, "escalated": 0}
 
 
 def binary_to_letter(binary_code: str) -> str:
@@ -33,163 +72,338 @@ def binary_to_letter_and_braille(binary_code: str) -> tuple[str, str]:
     return letter, braille_char
 
 
+# ? Rows closer than this fraction of the median cell height share a line
+LINE_HEIGHT_FACTOR = 0.5
+
+# ? Compact per-cell record shared by extraction, line grouping and drawing
+DETECTION_DTYPE = np.dtype(
+    [
+        ("x1", np.int32),
+        ("y1", np.int32),
+        ("x2", np.int32),
+        ("y2", np.int32),
+        ("x_center", np.float64),
+        ("y_center", np.float64),
+        ("conf", np.float32),
+        ("cls", np.int16),
+        ("binary", "U6"),
+        ("letter", "U1"),
+        ("braille_char", "U1"),
+    ]
+)
+
+
+@lru_cache(maxsize=8)
+def _class_lookup(names: tuple[str, ...]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    binaries = [name.strip() for name in names]
+    pairs = [binary_to_letter_and_braille(binary) for binary in binaries]
+    letters = np.array([letter for letter, _ in pairs], dtype="U1")
+    braille_chars = np.array([char for _, char in pairs], dtype="U1")
+    return np.array(binaries, dtype="U6"), letters, braille_chars
+
+
+def class_lookup(model_names: dict) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    names = tuple(model_names[i] for i in range(len(model_names)))
+    return _class_lookup(names)
+
+
+def results_to_detections(result) -> np.ndarray:
+    boxes = result.boxes
+    if boxes is None or len(boxes) == 0:
+        return np.empty(0, dtype=DETECTION_DTYPE)
+
+    # ? One device->host copy per tensor instead of one per box
+    xyxy = boxes.xyxy.cpu().numpy().astype(np.int32)
+    conf = boxes.conf.cpu().numpy()
+    cls = boxes.cls.cpu().numpy().astype(np.int16)
+    binaries, letters, braille_chars = class_lookup(result.names)
+
+    detections = np.empty(len(cls), dtype=DETECTION_DTYPE)
+    detections["x1"], detections["y1"] = xyxy[:, 0], xyxy[:, 1]
+    detections["x2"], detections["y2"] = xyxy[:, 2], xyxy[:, 3]
+    detections["x_center"] = (xyxy[:, 0] + xyxy[:, 2]) / 2
+    detections["y_center"] = (xyxy[:, 1] + xyxy[:, 3]) / 2
+    detections["conf"] = conf
+    detections["cls"] = cls
+    detections["binary"] = binaries[cls]
+    detections["letter"] = letters[cls]
+    detections["braille_char"] = braille_chars[cls]
+
+    order = np.lexsort((detections["x_center"], detections["y_center"]))
+    return detections[order]
+
+
+def detections_to_list(detections: np.ndarray) -> list[dict]:
+    bboxes = np.stack(
+        [detections["x1"], detections["y1"], detections["x2"], detections["y2"]],
+        axis=1,
+    ).tolist()
+    confidences = np.round(detections["conf"].astype(np.float64), 3).tolist()
+
+    return [
+        {
+            "binary": binary,
+            "letter": letter,
+            "braille_char": braille_char,
+            "confidence": confidence,
+            "bbox": bbox,
+        }
+        for binary, letter, braille_char, confidence, bbox in zip(
+            detections["binary"].tolist(),
+            detections["letter"].tolist(),
+            detections["braille_char"].tolist(),
+            confidences,
+            bboxes,
+        )
+    ]
+
+
 def draw_braille_detections(
-    image_path: str,
-    results,
+    frame: Frame,
+    detections: np.ndarray,
     border_color=(245, 166, 35),
     font_color=(255, 255, 255),
     bg_color=(245, 166, 35),
     thickness=2,
-    font_scale=0.35,
+    font_size=16,
     show_confidence=False,
+    max_size: int | None = None,
 ):
-
-    img = np.array(Image.open(image_path).convert("RGB"))
-    vector_resultados = []
-
-    boxes = results[0].boxes
-    model_names = results[0].names
-
-    for box in boxes:
-        xyxy = box.xyxy[0].cpu().numpy()
-        x1, y1, x2, y2 = map(int, xyxy)
-        conf = float(box.conf.cpu())
-        cls_idx = int(box.cls.cpu().numpy())
-
-        cls_bin = model_names[cls_idx].strip()
-        letter, braille_char = binary_to_letter_and_braille(cls_bin)
-
-        # ? Draw a rectangle
-        cv2.rectangle(img, (x1, y1), (x2, y2), border_color, thickness)
-
-        # ? Add tag
-        text_label = "{} {}".format(
-            letter, str(round(conf, 3)) if show_confidence else letter
-        )
-        (text_w, text_h), _ = cv2.getTextSize(
-            text_label, cv2.FONT_HERSHEY_SIMPLEX, font_scale * 2, 2
-        )
-        cv2.rectangle(img, (x1, y1 - text_h - 6), (x1 + text_w + 4, y1), bg_color, -1)
-        cv2.putText(
-            img,
-            text_label,
-            (x1 + 2, y1 - 4),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            font_scale * 2,
-            font_color,
-            2,
-        )
-
-        vector_resultados.append(
-            {
-                "binary": cls_bin,
-                "letter": letter,
-                "braille_char": braille_char,
-                "confidence": round(conf, 3),
-                "bbox": [x1, y1, x2, y2],
-            }
+    # ? One BGR buffer; labels come from the sprite cache (small alphabet)
+    if max_size:
+        img, scale = downscale(frame.image, max_size)
+    else:
+        img, scale = frame.image.copy(), 1.0
+    boxes = np.stack(
+        [detections["x1"], detections["y1"], detections["x2"], detections["y2"]],
+        axis=1,
+    )
+    boxes = np.rint(boxes * scale).astype(np.int32) if scale != 1.0 else boxes
+    labels = [
+        (f"{char} {letter} {conf:.2f}" if show_confidence else f"{char} {letter}")
+        for char, letter, conf in zip(
+            detections["braille_char"], detections["letter"], detections["conf"]
         )
+    ]
+    draw_labeled_boxes(
+        img,
+        boxes,
+        labels,
+        border_color=border_color,
+        font_color=font_color,
+        bg_color=bg_color,
+        thickness=thickness,
+        font_size=font_size,
+    )
 
-    # ? Save image
-    pil_img = Image.fromarray(img)
-    img_bytes = io.BytesIO()
-    pil_img.save(img_bytes, format="JPEG")
-    img_bytes.seek(0)
-
-    return img_bytes, vector_resultados
+    return encode_image(img), detections_to_list(detections)
 
 
 # ? Function to convert image to segmentation
 def image_braille_to_segmentation(
-    file, conf_threshold: float = 0.15, iou_threshold: float = 0.15
+    file,
+    conf_threshold: float = 0.15,
+    iou_threshold: float = 0.15,
+    output: str = "image",
 ):
     try:
-        safe_filename = generate_unique_filename(file.filename)
-        temp_path = os.path.join("/tmp", safe_filename)
-        with open(temp_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        frame = Frame.from_upload(file)
+        detections = extract_detections(frame, conf_threshold, iou_threshold)
+
+        # ? json skips drawing/encoding; the client renders the overlay itself
+        if output == "json":
+            return {
+                "width": frame.width,
+                "height": frame.height,
+                "detections": detections_to_list(detections),
+            }
 
-        results = run_model_prediction(temp_path, conf_threshold, iou_threshold)
         img_bytes, _ = draw_braille_detections(
-            temp_path, results, show_confidence=False
+            frame,
+            detections,
+            show_confidence=False,
+            max_size=PREVIEW_MAX_SIZE if output == "preview" else None,
         )
         return img_bytes
 
     except Exception as e:
-        raise RuntimeError("{Messages.EXCEPTION_DEFAULT}: {e}")
-
-
-def extract_detections(temp_path: str, conf_threshold: float, iou_threshold: float):
-    results = run_model_prediction(temp_path, conf_threshold, iou_threshold)
-    boxes = results[0].boxes
-    model_names = results[0].names
+        raise RuntimeError(f"{Messages.EXCEPTION_DEFAULT}: {e}")
 
-    detections = []
-    for box in boxes:
-        xyxy = box.xyxy[0].cpu().numpy()
-        x1, y1, x2, y2 = map(int, xyxy)
-        cls_idx = int(box.cls.cpu().numpy())
-        cls_bin = model_names[cls_idx].strip()
 
-        letter, _ = binary_to_letter_and_braille(cls_bin)
+def extract_detections(
+    frame: Frame, conf_threshold: float, iou_threshold: float, tiled: bool = TILING
+) -> np.ndarray:
+    if tiled:
+        return extract_detections_tiled(frame, conf_threshold, iou_threshold)
 
-        detections.append(
-            {
-                "letter": letter,
-                "x_center": (x1 + x2) / 2,
-                "y_center": (y1 + y2) / 2,
-            }
+    if CASCADE:
+        detections = detections_from_raw(
+            frame, conf_threshold, iou_threshold, CASCADE_IMGSZ
         )
-
-    detections.sort(key=lambda d: (d["y_center"], d["x_center"]))
+        if not needs_full_pass(detections):
+            return detections
+
+    return detections_from_raw(frame, conf_threshold, iou_threshold)
+
+
+def detections_from_raw(
+    frame: Frame,
+    conf_threshold: float,
+    iou_threshold: float,
+    imgsz: int | None = None,
+) -> np.ndarray:
+    # ? Changing conf/iou for an image seen recently only redoes thresholding/NMS
+    key = cache_key("raw", frame.digest, model_path(MODEL_NAME), imgsz)
+    raw = raw_prediction_cache.get_or_compute(
+        key, lambda: run_model_raw([frame.image], imgsz=imgsz)[0]
+    )
+    result = filter_raw_prediction(raw, frame.image, conf_threshold, iou_threshold)
+    return results_to_detections(result)
+
+
+def needs_full_pass(detections: np.ndarray) -> bool:
+    confidences = detections["conf"]
+    escalate = (
+        len(detections) < CASCADE_MIN_CELLS
+        or float(np.median(confidences)) < CASCADE_MIN_CONF
+        or float(np.mean(confidences < CASCADE_LOW_CONF)) > CASCADE_MAX_LOW_FRACTION
+    )
+
+    with _cascade_lock:
+        _cascade_stats["escalated" if escalate else "cheap"] += 1
+    return escalate
+
+
+def cascade_stats() -> dict:
+    with _cascade_lock:
+        return {"enabled": CASCADE, "imgsz": CASCADE_IMGSZ, **_cascade_stats}
+
+
+def offset_detections(detections: np.ndarray, x0: int, y0: int) -> np.ndarray:
+    for field in ("x1", "x2", "x_center"):
+        detections[field] += x0
+    for field in ("y1", "y2", "y_center"):
+        detections[field] += y0
     return detections
 
 
-def group_by_line(detections: list[dict], y_threshold: int = 20) -> list[list[dict]]:
-    if not detections:
-        return []
-
-    lines = []
-    current_line = [detections[0]]
-
-    for det in detections[1:]:
-        if abs(det["y_center"] - current_line[-1]["y_center"]) < y_threshold:
-            current_line.append(det)
-        else:
-            lines.append(current_line)
-            current_line = [det]
-
-    lines.append(current_line)
-    return lines
-
+def extract_detections_tiled(
+    frame: Frame,
+    conf_threshold: float,
+    iou_threshold: float,
+    tile_size: int = TILE_SIZE,
+    overlap: int = TILE_OVERLAP,
+    batch_size: int = BATCH_SIZE,
+) -> np.ndarray:
+    # ? Tiles run at native resolution, a batch at a time, and only their
+    # ? compact detections are kept while the page is scanned
+    image = frame.image
+    parts = []
+
+    for batch in iter_tile_batches(image, tile_size, overlap, batch_size):
+        results = run_model_prediction_batch(
+            [tile for _, _, tile in batch],
+            conf_threshold,
+            iou_threshold,
+            batch_size=len(batch),
+        )
+        for (x0, y0, tile), result in zip(batch, results):
+            detections = results_to_detections(result)
+            boxes = np.stack(
+                [
+                    detections["x1"],
+                    detections["y1"],
+                    detections["x2"],
+                    detections["y2"],
+                ],
+                axis=1,
+            )
+            keep = inner_edge_mask(boxes, x0, y0, tile.shape[:2], image.shape[:2])
+            parts.append(offset_detections(detections[keep], x0, y0))
+
+    detections = np.concatenate(parts)
+    if len(detections) == 0:
+        return detections
+
+    # ? Cells seen whole by two overlapping tiles are kept once
+    boxes = np.stack(
+        [detections["x1"], detections["y1"], detections["x2"], detections["y2"]],
+        axis=1,
+    )
+    detections = detections[nms(boxes, detections["conf"], TILE_NMS_IOU)]
+
+    order = np.lexsort((detections["x_center"], detections["y_center"]))
+    return detections[order]
+
+
+def line_threshold(detections: np.ndarray, factor: float = LINE_HEIGHT_FACTOR) -> float:
+    # ? Scale-independent row threshold: a fraction of the median cell height
+    heights = detections["y2"] - detections["y1"]
+    return float(np.median(heights)) * factor
+
+
+def group_by_line(
+    detections: np.ndarray, y_threshold: float | None = None
+) -> np.ndarray:
+    # ? Returns the line index of every detection (detections sorted by y, x)
+    if len(detections) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    if y_threshold is None:
+        y_threshold = line_threshold(detections)
+
+    breaks = np.abs(np.diff(detections["y_center"])) >= y_threshold
+    return np.concatenate(([0], np.cumsum(breaks)))
+
+
+def _median_by_group(values: np.ndarray, groups: np.ndarray, n_groups: int):
+    order = np.lexsort((values, groups))
+    values = values[order]
+
+    counts = np.bincount(groups, minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+    has_values = counts > 0
+
+    medians = np.zeros(n_groups, dtype=np.float64)
+    low = (starts + (counts - 1) // 2)[has_values]
+    high = (starts + counts // 2)[has_values]
+    medians[has_values] = (values[low] + values[high]) / 2
+    return medians
+
+
+def merge_text(
+    detections: np.ndarray, line_ids: np.ndarray, space_factor: float = 1.8
+) -> str:
+    if len(detections) == 0:
+        return ""
+
+    # ? Sort every line by x in a single pass
+    order = np.lexsort((detections["x_center"], line_ids))
+    x = detections["x_center"][order]
+    lines = line_ids[order]
+    letters = detections["letter"][order]
+    n_lines = int(lines[-1]) + 1
+
+    # ? Gaps between neighbouring cells of the same line
+    dx = np.diff(x)
+    gap_lines = lines[:-1]
+    same_line = gap_lines == lines[1:]
+
+    avg_distance = _median_by_group(dx[same_line], gap_lines[same_line], n_lines)[
+        gap_lines
+    ]
+    avg10percent = avg_distance * 0.1
+    space_after = same_line & (
+        (dx > (avg_distance + avg10percent) * space_factor)
+        | (dx > (avg_distance - avg10percent) * space_factor)
+    )
+
+    cells = np.char.add(letters, np.where(np.append(space_after, False), " ", ""))
+    line_starts = np.flatnonzero(np.diff(lines)) + 1
 
-def merge_text(lines: list[list[dict]], space_factor: float = 1.8) -> str:
     text_lines = []
-    for line in lines:
-        line.sort(key=lambda d: d["x_center"])
-        letters = []
-
-        if len(line) == 1:
-            letters.append(line[0]["letter"])
-        else:
-            distances = [
-                line[i + 1]["x_center"] - line[i]["x_center"]
-                for i in range(len(line) - 1)
-            ]
-            avg_distance = np.median(distances)
-            avg10percent = avg_distance * 0.1
-
-            for i, det in enumerate(line):
-                letters.append(det["letter"])
-                if i < len(line) - 1:
-                    dx = line[i + 1]["x_center"] - det["x_center"]
-                    if (
-                        dx > (avg_distance + avg10percent) * space_factor
-                        or dx > (avg_distance - avg10percent) * space_factor
-                    ):
-                        letters.append(" ")
-
-        line_text = "".join(letters).replace("?", "*").lower()
+    for line_cells in np.split(cells, line_starts):
+        line_text = "".join(line_cells.tolist()).replace("?", "*").lower()
 
         if line_text.startswith("k") and len(line_text) > 1:
             line_text = line_text[1].upper() + line_text[2:]
@@ -199,28 +413,140 @@ def merge_text(lines: list[list[dict]], space_factor: float = 1.8) -> str:
     return " ".join(text_lines)
 
 
+def braille_settings() -> tuple:
+    # ? Every setting that changes the recognized text; the disk cache outlives
+    # ? restarts, so a config change must change the key
+    return (
+        model_path(MODEL_NAME),
+        MAX_DETECTIONS,
+        LINE_HEIGHT_FACTOR,
+        TILING and (TILE_SIZE, TILE_OVERLAP, TILE_NMS_IOU),
+        CASCADE
+        and (
+            CASCADE_IMGSZ,
+            CASCADE_MIN_CELLS,
+            CASCADE_MIN_CONF,
+            CASCADE_LOW_CONF,
+            CASCADE_MAX_LOW_FRACTION,
+        ),
+    )
+
+
+def braille_cache_key(
+    digest: str, conf_threshold: float, iou_threshold: float, y_threshold
+) -> str:
+    return cache_key(
+        "braille",
+        digest,
+        braille_settings(),
+        conf_threshold,
+        iou_threshold,
+        y_threshold,
+    )
+
+
 # ? Function to convert image to text
 def image_braille_to_text(
     file,
     conf_threshold: float = 0.15,
     iou_threshold: float = 0.15,
-    y_threshold: int = 20,
+    y_threshold: float | None = None,
 ) -> str:
     try:
-        safe_filename = generate_unique_filename(file.filename)
-        temp_path = os.path.join("/tmp", safe_filename)
-        with open(temp_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        data = read_upload(file)
+        digest = content_hash(data)
+
+        def compute() -> str:
+            frame = Frame.from_bytes(data, file.filename, digest)
+            detections = extract_detections(frame, conf_threshold, iou_threshold)
+            return detections_to_text(detections, y_threshold)
+
+        key = braille_cache_key(digest, conf_threshold, iou_threshold, y_threshold)
+        return recognition_cache.get_or_compute(key, compute)
+
+    except Exception as e:
+        raise RuntimeError(f"{Messages.EXCEPTION_DEFAULT}: {e}")
+
+
+def detections_to_text(detections: np.ndarray, y_threshold: float | None = None) -> str:
+    if len(detections) == 0:
+        return ""
+
+    # TODO: solve problems with ñ, uppercase, pq, v#, nm
+    line_ids = group_by_line(detections, y_threshold)
+    return clean_text_spell(merge_text(detections, line_ids))
+
+
+def frames_braille_to_text(
+    frames: list[Frame],
+    conf_threshold: float,
+    iou_threshold: float,
+    y_threshold: float | None,
+    batch_size: int,
+) -> list[str]:
+    if TILING:
+        return [
+            detections_to_text(
+                extract_detections_tiled(frame, conf_threshold, iou_threshold),
+                y_threshold,
+            )
+            for frame in frames
+        ]
+
+    images = [frame.image for frame in frames]
+    detections = [None] * len(frames)
+
+    if CASCADE:
+        results = run_model_prediction_batch(
+            images, conf_threshold, iou_threshold, batch_size, imgsz=CASCADE_IMGSZ
+        )
+        for i, result in enumerate(results):
+            page_detections = results_to_detections(result)
+            if not needs_full_pass(page_detections):
+                detections[i] = page_detections
+
+    # ? Pages not settled by the cheap pass run at full input size
+    pending = [i for i, page in enumerate(detections) if page is None]
+    results = run_model_prediction_batch(
+        [images[i] for i in pending], conf_threshold, iou_threshold, batch_size
+    )
+    for i, result in zip(pending, results):
+        detections[i] = results_to_detections(result)
 
-        detections = extract_detections(temp_path, conf_threshold, iou_threshold)
-        if not detections:
-            return ""
+    return [detections_to_text(page, y_threshold) for page in detections]
+
+
+# ? Function to convert many images to text with batched inference
+def images_braille_to_text(
+    files,
+    conf_threshold: float = 0.15,
+    iou_threshold: float = 0.15,
+    y_threshold: float | None = None,
+    batch_size: int = BATCH_SIZE,
+) -> list[str]:
+    try:
+        uploads = [read_upload(file) for file in files]
+        digests = [content_hash(data) for data in uploads]
+        keys = [
+            braille_cache_key(digest, conf_threshold, iou_threshold, y_threshold)
+            for digest in digests
+        ]
+        texts = [recognition_cache.get(key) for key in keys]
+
+        # ? Only pages missing from the cache go through the model
+        pending = [i for i, text in enumerate(texts) if text is MISSING]
+        frames = [
+            Frame.from_bytes(uploads[i], files[i].filename, digests[i]) for i in pending
+        ]
+        converted = frames_braille_to_text(
+            frames, conf_threshold, iou_threshold, y_threshold, batch_size
+        )
 
-        # TODO: solve problems with ñ, uppercase, pq, v#, nm
-        lines = group_by_line(detections, y_threshold)
-        final_text = clean_text_spell(merge_text(lines))
+        for i, text in zip(pending, converted):
+            recognition_cache.put(keys[i], text)
+            texts[i] = text
 
-        return final_text
+        return texts
 
     except Exception as e:
         raise RuntimeError(f"{Messages.EXCEPTION_DEFAULT}: {e}")
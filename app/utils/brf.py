@@ -1,10 +1,231 @@
-import subprocess
 import io
+import os
+import re
+import ctypes
+import ctypes.util
+import threading
+import subprocess
+from dataclasses import dataclass
+from functools import lru_cache
+from dotenv import load_dotenv
 
+# Core
+from app.core.logging_config import get_logger
+
+# Utils
+from app.utils.cache import MISSING, translation_cache
+
+load_dotenv()
+
+logger = get_logger()
+
+BRAILLE_TABLE = "es-g1.ctb"
+DISPLAY_TABLE = "unicode.dis"
+
+# ? auto: liblouis loaded in-process when available, lou_translate otherwise.
+# ? ctypes: in-process only, errors are raised; subprocess: lou_translate only
+LOUIS_ENGINE = os.getenv("LOUIS_ENGINE", "auto").lower()
+LIBLOUIS_PATH = os.getenv("LIBLOUIS_PATH", "")
+
+# ? liblouis translationModes
+DOTS_IO = 4
+
+# ? Memoization unit. The capital and number indicators of these tables
+# ? (capsletter, begcapsword, numsign) only reach the end of the word, so a line
+# ? translates to the concatenation of its words and the whitespace between
+# ? them. Any other table is memoized per line, the unit lou_translate
+# ? translates on its own
+WORD_SCOPED_TABLES = {"es-g1.ctb"}
+WHITESPACE = re.compile(r"(\s+)")
+# ? Longer units are rare (OCR noise) and are translated without being stored
+CACHE_MAX_CHARS = int(os.getenv("BRAILLE_CACHE_MAX_CHARS", "64"))
+
+# ? liblouis keeps compiled tables in global state and is not thread safe
+_louis_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def load_liblouis():
+    if LOUIS_ENGINE == "subprocess":
+        return None
+
+    path = LIBLOUIS_PATH or ctypes.util.find_library("louis")
+    try:
+        if not path:
+            raise OSError("liblouis no encontrada")
+        lib = ctypes.CDLL(path)
+    except OSError as e:
+        if LOUIS_ENGINE == "ctypes":
+            raise
+        logger.warning(f"liblouis no disponible, se usará lou_translate: {e}")
+        return None
+
+    lib.lou_charSize.restype = ctypes.c_int
+    lib.lou_translate.restype = ctypes.c_int
+    lib.lou_translate.argtypes = [
+        ctypes.c_char_p,
+        ctypes.c_void_p,
+        ctypes.POINTER(ctypes.c_int),
+        ctypes.c_void_p,
+        ctypes.POINTER(ctypes.c_int),
+        ctypes.c_void_p,
+        ctypes.c_char_p,
+        ctypes.POINTER(ctypes.c_int),
+        ctypes.POINTER(ctypes.c_int),
+        ctypes.POINTER(ctypes.c_int),
+        ctypes.c_int,
+    ]
+    lib.lou_dotsToChar.restype = ctypes.c_int
+    lib.lou_dotsToChar.argtypes = [
+        ctypes.c_char_p,
+        ctypes.c_void_p,
+        ctypes.c_void_p,
+        ctypes.c_int,
+        ctypes.c_int,
+    ]
+    return lib
+
+
+@lru_cache(maxsize=1)
+def widechar_codec() -> tuple[type, str]:
+    # ? widechar is 16 or 32 bits depending on how liblouis was built
+    if load_liblouis().lou_charSize() == 4:
+        return ctypes.c_uint32, "utf-32-le"
+    return ctypes.c_uint16, "utf-16-le"
+
+
+def _widechar_buffer(size: int, data: bytes = b""):
+    char_type, _ = widechar_codec()
+    buffer = (char_type * max(size, 1))()
+    ctypes.memmove(buffer, data, len(data))
+    return buffer
+
+
+@dataclass
+class Translation:
+    """Braille de un segmento y la correspondencia de posiciones entrada/salida."""
+
+    braille: str
+    output_pos: list[int] | None = None  # por carácter de entrada: índice en braille
+    input_pos: list[int] | None = None  # por carácter braille: índice en la entrada
+
+
+def _widechar_index(text: str, encoding: str) -> list[int] | None:
+    # ? Map widechar offsets to str offsets; only differs for UTF-16 surrogates
+    if encoding != "utf-16-le" or all(ord(char) <= 0xFFFF for char in text):
+        return None
+
+    index = []
+    for position, char in enumerate(text):
+        index.extend([position] * (2 if ord(char) > 0xFFFF else 1))
+    return index
+
+
+def _louis_translate_segment(
+    segment: str,
+    table: str,
+    display_table: str | None,
+    positions: bool = False,
+) -> Translation:
+    if not segment:
+        return Translation("", [] if positions else None, [] if positions else None)
+
+    lib = load_liblouis()
+    char_type, encoding = widechar_codec()
+    data = segment.encode(encoding)
+    length = len(data) // ctypes.sizeof(char_type)
+    inbuf = _widechar_buffer(length, data)
+    mode = DOTS_IO if display_table else 0
+
+    capacity = length * 4 + 16
+    while True:
+        inlen, outlen = ctypes.c_int(length), ctypes.c_int(capacity)
+        outbuf = _widechar_buffer(capacity)
+        output_pos = (ctypes.c_int * length)() if positions else None
+        input_pos = (ctypes.c_int * capacity)() if positions else None
+        ok = lib.lou_translate(
+            table.encode(),
+            inbuf,
+            ctypes.byref(inlen),
+            outbuf,
+            ctypes.byref(outlen),
+            None,
+            None,
+            output_pos,
+            input_pos,
+            None,
+            mode,
+        )
+        if not ok:
+            raise RuntimeError(f"liblouis no pudo traducir con {table}")
+        # ? Output buffer full before the whole input was consumed: grow it
+        if inlen.value >= length or outlen.value < capacity:
+            break
+        capacity *= 2
+
+    if display_table:
+        cells = outbuf
+        outbuf = _widechar_buffer(outlen.value)
+        if not lib.lou_dotsToChar(
+            display_table.encode(), cells, outbuf, outlen.value, 0
+        ):
+            raise RuntimeError(f"liblouis no pudo aplicar {display_table}")
+
+    size = ctypes.sizeof(char_type)
+    braille = bytes(outbuf)[: outlen.value * size].decode(encoding)
+    if not positions:
+        return Translation(braille)
+
+    output_pos, input_pos = remap_positions(
+        segment,
+        braille,
+        list(output_pos[: inlen.value]),
+        list(input_pos[: outlen.value]),
+        encoding,
+    )
+    return Translation(braille, output_pos, input_pos)
+
+
+def remap_positions(
+    segment: str,
+    braille: str,
+    output_pos: list[int],
+    input_pos: list[int],
+    encoding: str,
+) -> tuple[list[int], list[int]]:
+    """Convierte posiciones en widechar de liblouis a índices de str."""
+    in_index = _widechar_index(segment, encoding)
+    out_index = _widechar_index(braille, encoding)
+    if in_index:
+        output_pos = [
+            output_pos[i]
+            for i in range(len(in_index))
+            if i == 0 or in_index[i] != in_index[i - 1]
+        ]
+        input_pos = [in_index[pos] for pos in input_pos]
+    if out_index:
+        input_pos = [
+            input_pos[i]
+            for i in range(len(out_index))
+            if i == 0 or out_index[i] != out_index[i - 1]
+        ]
+        output_pos = [out_index[pos] for pos in output_pos]
+    return output_pos, input_pos
+
+
+def _louis_translate_line(line: str, table: str, display_table: str | None) -> str:
+    return _louis_translate_segment(line, table, display_table).braille
+
+
+def run_lou_translate(
+    text: str, table: str = BRAILLE_TABLE, display_table: str | None = None
+) -> str:
+    command = ["lou_translate", "--forward", table]
+    if display_table:
+        command.insert(1, f"--display-table={display_table}")
 
-def translate_to_brf_content(text: str) -> str:
     result = subprocess.run(
-        ["lou_translate", "--forward", "es-g1.ctb"],
+        command,
         input=text,
         capture_output=True,
         text=True,
@@ -13,19 +234,191 @@ def translate_to_brf_content(text: str) -> str:
     return result.stdout
 
 
-def text_to_ascii_braille(text: str) -> str:
-    table_path = "es-g1.ctb"
-    display_table = "unicode.dis"
+def split_lines(text: str) -> list[str]:
+    # ? Same framing as lou_translate: one output line per input line
+    if not text:
+        return []
+    lines = text.split("\n")
+    if text.endswith("\n"):
+        lines.pop()
+    return lines
 
-    result = subprocess.run(
-        ["lou_translate", f"--display-table={display_table}", "--forward", table_path],
-        input=text,
-        capture_output=True,
-        text=True,
-        check=True,
+
+def translate_uncached(
+    segments: list[str], table: str, display_table: str | None
+) -> list[str]:
+    """Traduce segmentos sin saltos de línea en una sola pasada, sin memoización."""
+    if load_liblouis() is not None:
+        try:
+            with _louis_lock:
+                return [
+                    _louis_translate_line(segment, table, display_table)
+                    for segment in segments
+                ]
+        except RuntimeError as e:
+            # ? LOUIS_ENGINE=ctypes means in-process only, never the binary
+            if LOUIS_ENGINE == "ctypes":
+                raise
+            logger.warning(f"{e}; se usará lou_translate")
+
+    output = run_lou_translate("\n".join(segments) + "\n", table, display_table)
+    lines = output.split("\n")[: len(segments)]
+    if len(lines) != len(segments):
+        lines = [
+            "".join(split_lines(run_lou_translate(segment, table, display_table)))
+            for segment in segments
+        ]
+    return lines
+
+
+def _memo_key(table: str, display_table: str | None, unit: str) -> str:
+    return f"{table}\x00{display_table or ''}\x00{unit}"
+
+
+def split_units(line: str, table: str) -> list[str]:
+    if table not in WORD_SCOPED_TABLES:
+        return [line] if line else []
+    return [unit for unit in WHITESPACE.split(line) if unit]
+
+
+def translate_memoized(
+    units: list[str], table: str, display_table: str | None, translate_missing
+) -> dict[str, str]:
+    """Braille de cada unidad distinta; solo `translate_missing` las no cacheadas."""
+    result = {"": ""}
+    missing = []
+    for unit in dict.fromkeys(unit for unit in units if unit):
+        braille = MISSING
+        if len(unit) <= CACHE_MAX_CHARS:
+            braille = translation_cache.get(_memo_key(table, display_table, unit))
+        if braille is MISSING:
+            missing.append(unit)
+        else:
+            result[unit] = braille
+
+    if missing:
+        for unit, braille in zip(missing, translate_missing(missing)):
+            if len(unit) <= CACHE_MAX_CHARS:
+                translation_cache.put(_memo_key(table, display_table, unit), braille)
+            result[unit] = braille
+
+    return result
+
+
+def translate(
+    text: str, table: str = BRAILLE_TABLE, display_table: str | None = None
+) -> str:
+    lines = [split_units(line, table) for line in split_lines(text)]
+    translations = translate_memoized(
+        [unit for units in lines for unit in units],
+        table,
+        display_table,
+        lambda missing: translate_uncached(missing, table, display_table),
+    )
+    return "".join(
+        "".join(translations[unit] for unit in units) + "\n" for units in lines
     )
 
-    return result.stdout.strip()
+
+def translate_to_brf_content(text: str) -> str:
+    return translate(text, BRAILLE_TABLE)
+
+
+def text_to_ascii_braille(text: str) -> str:
+    return translate(text, BRAILLE_TABLE, DISPLAY_TABLE).strip()
+
+
+def translate_segments(
+    segments: list[str],
+    table: str = BRAILLE_TABLE,
+    display_table: str | None = DISPLAY_TABLE,
+) -> list[Translation]:
+    """Traduce muchos segmentos en una pasada, con mapeo de posiciones.
+
+    Sin liblouis se usa una sola llamada a lou_translate (un segmento por
+    línea) y las posiciones quedan en None.
+    """
+    if not segments:
+        return []
+
+    if load_liblouis() is not None:
+        try:
+            with _louis_lock:
+                return [
+                    _louis_translate_segment(
+                        segment, table, display_table, positions=True
+                    )
+                    for segment in segments
+                ]
+        except RuntimeError as e:
+            # ? LOUIS_ENGINE=ctypes means in-process only, never the binary
+            if LOUIS_ENGINE == "ctypes":
+                raise
+            logger.warning(f"{e}; se usará lou_translate")
+
+    # ? Newlines would split a segment across output lines
+    lines = [segment.replace("\n", " ") for segment in segments]
+    return [
+        Translation(braille)
+        for braille in translate_uncached(lines, table, display_table)
+    ]
+
+
+def texts_to_ascii_braille(texts: list[str]) -> list[str]:
+    # ? One memoized pass, one line per text; positions are not needed here
+    if not texts:
+        return []
+
+    segments = [" ".join(text.split()) for text in texts]
+    output = translate("\n".join(segments) + "\n", BRAILLE_TABLE, DISPLAY_TABLE)
+    return [line.strip() for line in split_lines(output)]
+
+
+def split_by_words(translation: Translation, words: list[str]) -> list[str]:
+    # ? Each braille cell goes to the word its input character belongs to;
+    # ? cells of the separating spaces belong to none
+    owner = []
+    for index, word in enumerate(words):
+        owner.extend([index] * len(word))
+        owner.append(-1)
+
+    pieces = [[] for _ in words]
+    for cell, position in zip(translation.braille, translation.input_pos):
+        if 0 <= position < len(owner) and owner[position] >= 0:
+            pieces[owner[position]].append(cell)
+    return ["".join(piece) for piece in pieces]
+
+
+def translate_words(words: list[str]) -> list[str]:
+    # ? One liblouis pass for all the words, split back with the position mapping
+    if load_liblouis() is None:
+        return texts_to_ascii_braille(words)
+
+    [translation] = translate_segments([" ".join(words)])
+    if translation.input_pos is None:
+        return texts_to_ascii_braille(words)
+    return split_by_words(translation, words)
+
+
+def words_to_ascii_braille(words: list[str]) -> list[str]:
+    """Traduce las palabras como un solo texto y reparte el braille entre ellas.
+
+    Así los indicadores de mayúscula y número quedan como en la traducción del
+    texto completo. Con una tabla de indicadores por palabra cada palabra se
+    memoiza con la misma clave que usa translate. Sin mapeo de posiciones
+    (lou_translate) se traduce cada palabra por separado.
+    """
+    if not words:
+        return []
+
+    words = [" ".join(word.split()) for word in words]
+    if BRAILLE_TABLE not in WORD_SCOPED_TABLES:
+        return translate_words(words)
+
+    translations = translate_memoized(
+        words, BRAILLE_TABLE, DISPLAY_TABLE, translate_words
+    )
+    return [translations[word] for word in words]
 
 
 def text_to_brf_file(text: str):
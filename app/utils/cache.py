@@ -0,0 +1,190 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from dotenv import load_dotenv
+
+# Core
+from app.core.logging_config import get_logger
+
+load_dotenv()
+
+logger = get_logger()
+
+MISSING = object()
+
+
+def cache_key(*parts) -> str:
+    return hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()
+
+
+class ResultCache:
+    """LRU en memoria con TTL, segundo nivel opcional en disco y coalescencia.
+
+    Las solicitudes idénticas que llegan mientras el resultado se calcula
+    esperan a ese mismo cálculo en lugar de repetirlo.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_items: int = 512,
+        ttl: float = 3600,
+        disk_path: str | None = None,
+    ):
+        self.name = name
+        self.max_items = max_items
+        self.ttl = ttl
+        self.disk_path = disk_path
+        self._items: OrderedDict[str, tuple[float, object]] = OrderedDict()
+        self._inflight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+        }
+
+        if disk_path:
+            os.makedirs(disk_path, exist_ok=True)
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None and entry[0] > now:
+                self._items.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry[1]
+            if entry is not None:
+                del self._items[key]
+
+        value = self._read_disk(key, now)
+        with self._lock:
+            if value is MISSING:
+                self._stats["misses"] += 1
+                return MISSING
+            self._stats["disk_hits"] += 1
+
+        self._put_memory(key, value, now + self.ttl)
+        return value
+
+    def put(self, key: str, value) -> None:
+        expires_at = time.time() + self.ttl
+        self._put_memory(key, value, expires_at)
+        self._write_disk(key, value, expires_at)
+
+    def get_or_compute(self, key: str, compute):
+        value = self.get(key)
+        if value is not MISSING:
+            return value
+
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+            else:
+                self._stats["coalesced"] += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = compute()
+            self.put(key, value)
+            future.set_result(value)
+            return value
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["disk_hits"]
+            lookups += self._stats["misses"]
+            return {
+                "items": len(self._items),
+                "max_items": self.max_items,
+                "ttl": self.ttl,
+                "disk": bool(self.disk_path),
+                **self._stats,
+                "hit_rate": (
+                    (lookups - self._stats["misses"]) / lookups if lookups else 0.0
+                ),
+            }
+
+    def _put_memory(self, key: str, value, expires_at: float) -> None:
+        with self._lock:
+            self._items[key] = (expires_at, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def _disk_file(self, key: str) -> str:
+        return os.path.join(self.disk_path, f"{key}.json")
+
+    def _read_disk(self, key: str, now: float):
+        if not self.disk_path:
+            return MISSING
+
+        path = self._disk_file(key)
+        try:
+            with open(path, "r", encoding="utf-8") as handle:
+                entry = json.load(handle)
+        except (OSError, ValueError):
+            return MISSING
+
+        if entry["expires_at"] <= now:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return MISSING
+
+        return entry["value"]
+
+    def _write_disk(self, key: str, value, expires_at: float) -> None:
+        if not self.disk_path:
+            return
+
+        path = self._disk_file(key)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as handle:
+                json.dump({"expires_at": expires_at, "value": value}, handle)
+            os.replace(temp_path, path)
+        except (OSError, TypeError) as e:
+            logger.warning(f"No se pudo escribir la caché {self.name}: {e}")
+
+
+recognition_cache = ResultCache(
+    "recognition",
+    max_items=int(os.getenv("RESULT_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("RESULT_CACHE_TTL", "3600")),
+    disk_path=os.getenv("RESULT_CACHE_DIR") or None,
+)
+
+# ? Pre-NMS model output, kept briefly so threshold changes skip the backbone
+raw_prediction_cache = ResultCache(
+    "raw_predictions",
+    max_items=int(os.getenv("RAW_CACHE_SIZE", "32")),
+    ttl=float(os.getenv("RAW_CACHE_TTL", "300")),
+)
+
+# ? Braille translations by (table, display table, line); lines are capped at
+# ? BRAILLE_CACHE_MAX_CHARS, so memory is bounded by items x that length
+translation_cache = ResultCache(
+    "braille_translation",
+    max_items=int(os.getenv("BRAILLE_CACHE_SIZE", "20000")),
+    ttl=float(os.getenv("BRAILLE_CACHE_TTL", "86400")),
+)
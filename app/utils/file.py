@@ -1,5 +1,8 @@
 import os
 import uuid
+import hashlib
+import cv2
+import numpy as np
 from pathlib import Path
 from fastapi import HTTPException, UploadFile
 from dotenv import load_dotenv
@@ -38,6 +41,30 @@ def validate_file_size(file: UploadFile) -> int:
     return file_size
 
 
+def read_upload(file: UploadFile) -> bytes:
+    file.file.seek(0)
+    data = file.file.read()
+    file.file.seek(0)
+    return data
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def decode_image(data: bytes, filename: str = "") -> np.ndarray:
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    image = cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+
+    if image is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"No se pudo decodificar la imagen: {filename}",
+        )
+
+    return image
+
+
 def get_file_extension(filename: str) -> str:
     return Path(filename).suffix.lower()
 
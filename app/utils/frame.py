@@ -0,0 +1,48 @@
+import cv2
+import numpy as np
+from dataclasses import dataclass, field
+from functools import cached_property
+from fastapi import UploadFile
+
+# Utils
+from app.utils.file import content_hash, decode_image, read_upload
+
+
+@dataclass
+class Frame:
+    """Imagen decodificada una sola vez y compartida por todo el pipeline."""
+
+    filename: str
+    image: np.ndarray  # BGR, como la espera YOLO/OpenCV
+    digest: str = ""  # sha256 del archivo subido
+    cache: dict = field(default_factory=dict, repr=False, compare=False)
+
+    @classmethod
+    def from_bytes(
+        cls, data: bytes, filename: str = "", digest: str | None = None
+    ) -> "Frame":
+        return cls(
+            filename=filename,
+            image=decode_image(data, filename),
+            digest=digest or content_hash(data),
+        )
+
+    @classmethod
+    def from_upload(cls, file: UploadFile) -> "Frame":
+        return cls.from_bytes(read_upload(file), file.filename)
+
+    @property
+    def width(self) -> int:
+        return self.image.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.image.shape[0]
+
+    @cached_property
+    def rgb(self) -> np.ndarray:
+        return cv2.cvtColor(self.image, cv2.COLOR_BGR2RGB)
+
+    @cached_property
+    def gray(self) -> np.ndarray:
+        return cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY)
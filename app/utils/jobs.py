@@ -0,0 +1,159 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import threading
+from dotenv import load_dotenv
+
+# Utils
+from app.utils.file import get_file_extension, read_upload
+
+load_dotenv()
+
+NFS_PATH = os.getenv("NFS_PATH", "/")
+JOBS_PATH = os.getenv("JOBS_PATH") or os.path.join(NFS_PATH, "jobs")
+
+# ? Finished jobs (pages, results and output) are deleted after JOB_TTL seconds
+JOB_TTL = float(os.getenv("JOB_TTL", "86400"))
+
+# ? queued -> running -> done | failed
+JOB_ACTIVE_STATUSES = ("queued", "running")
+
+_lock = threading.Lock()
+
+
+def job_dir(job_id: str) -> str:
+    return os.path.join(JOBS_PATH, job_id)
+
+
+def _meta_path(job_id: str) -> str:
+    return os.path.join(job_dir(job_id), "job.json")
+
+
+def _write_json(path: str, data: dict) -> None:
+    # ? Atomic replace so a crash never leaves a half written job.json
+    temp_path = f"{path}.{threading.get_ident()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as handle:
+        json.dump(data, handle, ensure_ascii=False)
+    os.replace(temp_path, path)
+
+
+def page_path(job_id: str, index: int, filename: str) -> str:
+    return os.path.join(
+        job_dir(job_id), "pages", f"{index:05d}{get_file_extension(filename)}"
+    )
+
+
+def result_path(job_id: str, index: int) -> str:
+    return os.path.join(job_dir(job_id), "results", f"{index:05d}.txt")
+
+
+def output_path(job_id: str, extension: str) -> str:
+    return os.path.join(job_dir(job_id), f"output{extension}")
+
+
+def create_job(kind: str, files, params: dict) -> dict:
+    """Guarda las páginas subidas y registra el trabajo como pendiente."""
+    job_id = uuid.uuid4().hex
+    os.makedirs(os.path.join(job_dir(job_id), "pages"))
+    os.makedirs(os.path.join(job_dir(job_id), "results"))
+
+    pages = []
+    for index, file in enumerate(files):
+        with open(page_path(job_id, index, file.filename), "wb") as handle:
+            handle.write(read_upload(file))
+        pages.append(file.filename)
+
+    now = time.time()
+    job = {
+        "id": job_id,
+        "kind": kind,
+        "params": params,
+        "pages": pages,
+        "status": "queued",
+        "total_pages": len(pages),
+        "completed_pages": 0,
+        "error": None,
+        "page_errors": {},
+        "output": None,
+        "created_at": now,
+        "updated_at": now,
+    }
+    _write_json(_meta_path(job_id), job)
+    return job
+
+
+def read_job(job_id: str) -> dict | None:
+    try:
+        with open(_meta_path(job_id), "r", encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def update_job(job_id: str, **changes) -> dict:
+    with _lock:
+        job = read_job(job_id)
+        job.update(changes, updated_at=time.time())
+        _write_json(_meta_path(job_id), job)
+        return job
+
+
+def save_result(job_id: str, index: int, text: str) -> None:
+    path = result_path(job_id, index)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as handle:
+        handle.write(text)
+    os.replace(temp_path, path)
+
+
+def read_result(job_id: str, index: int) -> str | None:
+    try:
+        with open(result_path(job_id, index), "r", encoding="utf-8") as handle:
+            return handle.read()
+    except OSError:
+        return None
+
+
+def pending_pages(job: dict) -> list[int]:
+    # ? Pages with a stored result are done; this is the resume point
+    return [
+        index
+        for index in range(job["total_pages"])
+        if not os.path.exists(result_path(job["id"], index))
+    ]
+
+
+def list_active_jobs() -> list[dict]:
+    if not os.path.isdir(JOBS_PATH):
+        return []
+
+    jobs = [read_job(job_id) for job_id in sorted(os.listdir(JOBS_PATH))]
+    jobs = [job for job in jobs if job and job["status"] in JOB_ACTIVE_STATUSES]
+    return sorted(jobs, key=lambda job: job["created_at"])
+
+
+def purge_expired_jobs(ttl: float = JOB_TTL) -> int:
+    """Borra los trabajos terminados hace más de ttl segundos."""
+    if ttl <= 0 or not os.path.isdir(JOBS_PATH):
+        return 0
+
+    now = time.time()
+    removed = 0
+    for job_id in os.listdir(JOBS_PATH):
+        job = read_job(job_id)
+        if job is not None and job["status"] in JOB_ACTIVE_STATUSES:
+            continue
+
+        # ? No job.json: left behind by a crash while the upload was stored
+        try:
+            updated_at = job["updated_at"] if job else os.path.getmtime(job_dir(job_id))
+        except OSError:
+            continue
+
+        if now - updated_at > ttl:
+            shutil.rmtree(job_dir(job_id), ignore_errors=True)
+            removed += 1
+
+    return removed
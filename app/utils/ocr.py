@@ -0,0 +1,150 @@
+import os
+import threading
+from functools import lru_cache
+import numpy as np
+import pytesseract
+from dotenv import load_dotenv
+
+# Core
+from app.core.logging_config import get_logger
+
+load_dotenv()
+
+# ? One thread budget for every OCR caller (request workers, the page and
+# ? region pools, background jobs): at most OCR_SLOTS Tesseract runs at once,
+# ? each with THREADS_PER_PAGE OpenMP threads, so slots x threads ~ OCR_THREADS.
+# ? OMP_THREAD_LIMIT is read by libtesseract at start and inherited by the
+# ? tesseract binary; a value set by the operator wins over OCR_THREADS_PER_PAGE
+os.environ.setdefault("OMP_THREAD_LIMIT", os.getenv("OCR_THREADS_PER_PAGE", "1"))
+THREADS_PER_PAGE = max(1, int(os.environ["OMP_THREAD_LIMIT"]))
+OCR_THREADS = int(os.getenv("OCR_THREADS", "0")) or (os.cpu_count() or 1)
+OCR_SLOTS = max(1, OCR_THREADS // THREADS_PER_PAGE)
+PAGE_WORKERS = int(os.getenv("OCR_PAGE_WORKERS", "0")) or OCR_SLOTS
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+logger = get_logger()
+
+# ? auto: in-process tesserocr when installed, pytesseract subprocesses otherwise
+OCR_ENGINE = os.getenv("OCR_ENGINE", "auto").lower()
+TESSDATA_PREFIX = os.getenv("TESSDATA_PREFIX", "")
+
+_local = threading.local()
+_failed_langs: set[str] = set()
+_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(OCR_SLOTS)
+
+
+def use_tesserocr() -> bool:
+    if OCR_ENGINE == "pytesseract":
+        return False
+    if tesserocr is None:
+        if OCR_ENGINE == "tesserocr":
+            raise RuntimeError("OCR_ENGINE=tesserocr pero tesserocr no está instalado")
+        return False
+    return True
+
+
+def get_api(lang: str, psm: int = 6):
+    """Motor Tesseract del hilo actual; los datos del idioma se cargan una sola vez."""
+    apis = getattr(_local, "apis", None)
+    if apis is None:
+        apis = _local.apis = {}
+
+    key = (lang, psm)
+    if key not in apis:
+        options = {"path": TESSDATA_PREFIX} if TESSDATA_PREFIX else {}
+        apis[key] = tesserocr.PyTessBaseAPI(
+            lang=lang, psm=psm, oem=tesserocr.OEM.DEFAULT, **options
+        )
+    return apis[key]
+
+
+def _tesserocr_to_data(image: np.ndarray, lang: str, psm: int) -> dict:
+    api = get_api(lang, psm)
+    image = np.ascontiguousarray(image)
+    height, width = image.shape[:2]
+    channels = 1 if image.ndim == 2 else image.shape[2]
+    api.SetImageBytes(image.tobytes(), width, height, channels, width * channels)
+    api.Recognize()
+
+    data = {
+        key: [] for key in ("level", "text", "conf", "left", "top", "width", "height")
+    }
+    level = tesserocr.RIL.WORD
+    iterator = api.GetIterator()
+    if iterator is None:
+        return data
+
+    for word in tesserocr.iterate_level(iterator, level):
+        text = word.GetUTF8Text(level)
+        box = word.BoundingBox(level)
+        if text is None or box is None:
+            continue
+
+        x1, y1, x2, y2 = box
+        data["level"].append(5)
+        data["text"].append(text)
+        data["conf"].append(word.Confidence(level))
+        data["left"].append(x1)
+        data["top"].append(y1)
+        data["width"].append(x2 - x1)
+        data["height"].append(y2 - y1)
+
+    return data
+
+
+def image_to_data(image: np.ndarray, lang: str = "eng", psm: int = 6) -> dict:
+    """Palabras reconocidas con el mismo formato que pytesseract.image_to_data."""
+    with _slots:
+        return _image_to_data(image, lang, psm)
+
+
+def _image_to_data(image: np.ndarray, lang: str, psm: int) -> dict:
+    if use_tesserocr() and lang not in _failed_langs:
+        try:
+            return _tesserocr_to_data(image, lang, psm)
+        except RuntimeError as e:
+            # ? Missing traineddata etc.: remember it and stay on pytesseract
+            with _lock:
+                _failed_langs.add(lang)
+            logger.warning(f"tesserocr no disponible para '{lang}': {e}")
+
+    return pytesseract.image_to_data(
+        image,
+        lang=lang,
+        config=f"--oem 3 --psm {psm}",
+        output_type=pytesseract.Output.DICT,
+    )
+
+
+def ocr_engine() -> str:
+    return "tesserocr" if use_tesserocr() else "pytesseract"
+
+
+def ocr_budget() -> dict:
+    return {
+        "threads": OCR_THREADS,
+        "threads_per_page": THREADS_PER_PAGE,
+        "slots": OCR_SLOTS,
+        "page_workers": PAGE_WORKERS,
+    }
+
+
+@lru_cache(maxsize=1)
+def tesseract_version() -> str:
+    try:
+        if use_tesserocr():
+            return tesserocr.tesseract_version().split()[1]
+        return str(pytesseract.get_tesseract_version())
+    except Exception as e:
+        logger.warning(f"No se pudo obtener la versión de Tesseract: {e}")
+        return "unknown"
+
+
+def ocr_signature() -> str:
+    # ? Engines and Tesseract releases do not read text identically
+    return f"{ocr_engine()}:{tesseract_version()}"
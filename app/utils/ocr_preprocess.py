@@ -0,0 +1,175 @@
+import os
+import cv2
+import numpy as np
+from dataclasses import dataclass
+from dotenv import load_dotenv
+
+# Utils
+from app.utils.frame import Frame
+
+load_dotenv()
+
+# ? Tesseract reads best around 20 px of x-height; 12 MP photos are far above it.
+# ? Off by default until its accuracy has been measured on real pages
+NORMALIZE = os.getenv("OCR_NORMALIZE", "false").lower() == "true"
+TARGET_X_HEIGHT = float(os.getenv("OCR_TARGET_X_HEIGHT", "20"))
+MIN_SCALE = float(os.getenv("OCR_MIN_SCALE", "0.2"))
+MAX_SCALE = float(os.getenv("OCR_MAX_SCALE", "3.0"))
+DESKEW = os.getenv("OCR_DESKEW", "false").lower() == "true"
+BINARIZE = os.getenv("OCR_BINARIZE", "false").lower() == "true"
+CROP = os.getenv("OCR_CROP", "false").lower() == "true"
+CROP_MARGIN = int(os.getenv("OCR_CROP_MARGIN", "16"))
+
+ANALYSIS_SIZE = 1200
+MIN_COMPONENTS = 3
+MAX_SKEW = 15.0
+
+
+@dataclass
+class OcrParams:
+    """Transformación aplicada a la imagen antes del OCR."""
+
+    scale: float = 1.0
+    angle: float = 0.0
+    crop: tuple[int, int, int, int] | None = None  # x1, y1, x2, y2 en la original
+    rotation: np.ndarray | None = None  # matriz afín 2x3 sobre el recorte
+
+
+def preprocess_signature() -> str:
+    return (
+        f"{NORMALIZE}:{TARGET_X_HEIGHT}:{MIN_SCALE}:{MAX_SCALE}:"
+        f"{DESKEW}:{BINARIZE}:{CROP}:{CROP_MARGIN}"
+    )
+
+
+def text_components(gray: np.ndarray) -> np.ndarray:
+    """Estadísticas (x, y, w, h, área) de los componentes con forma de carácter."""
+    binary = cv2.adaptiveThreshold(
+        gray, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY_INV, 31, 15
+    )
+    _, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    stats = stats[1:]
+
+    height = gray.shape[0]
+    w, h, area = stats[:, 2], stats[:, 3], stats[:, 4]
+    keep = (
+        (area >= 4)
+        & (h >= 3)
+        & (h <= height / 4)
+        & (w <= h * 4)
+        & (area >= w * h * 0.1)
+    )
+    return stats[keep]
+
+
+def estimate_params(frame: Frame) -> OcrParams:
+    gray = frame.gray
+    factor = min(1.0, ANALYSIS_SIZE / max(gray.shape[:2]))
+    if factor < 1.0:
+        gray = cv2.resize(
+            gray, None, fx=factor, fy=factor, interpolation=cv2.INTER_AREA
+        )
+
+    components = text_components(gray)
+    if len(components) < MIN_COMPONENTS:
+        return OcrParams()
+
+    params = OcrParams()
+    x_height = float(np.median(components[:, 3])) / factor
+    scale = float(np.clip(TARGET_X_HEIGHT / x_height, MIN_SCALE, MAX_SCALE))
+    # ? Close enough: resampling would only cost time and sharpness
+    if not 0.8 <= scale <= 1.25:
+        params.scale = scale
+
+    if CROP:
+        x1 = components[:, 0].min() / factor - CROP_MARGIN
+        y1 = components[:, 1].min() / factor - CROP_MARGIN
+        x2 = (components[:, 0] + components[:, 2]).max() / factor + CROP_MARGIN
+        y2 = (components[:, 1] + components[:, 3]).max() / factor + CROP_MARGIN
+        params.crop = (
+            max(0, int(x1)),
+            max(0, int(y1)),
+            min(frame.width, int(np.ceil(x2))),
+            min(frame.height, int(np.ceil(y2))),
+        )
+
+    if DESKEW:
+        centers = components[:, :2] + components[:, 2:4] / 2
+        angle = cv2.minAreaRect(centers.astype(np.float32))[2]
+        angle = angle - 90 if angle > 45 else angle
+        if 0.5 <= abs(angle) <= MAX_SKEW:
+            x1, y1, x2, y2 = params.crop or (0, 0, frame.width, frame.height)
+            params.angle = angle
+            params.rotation = cv2.getRotationMatrix2D(
+                ((x2 - x1) / 2, (y2 - y1) / 2), angle, 1.0
+            )
+
+    return params
+
+
+def ocr_params(frame: Frame) -> OcrParams:
+    # ? Computed once per request and shared by every OCR call on the frame
+    if "ocr_params" not in frame.cache:
+        frame.cache["ocr_params"] = estimate_params(frame) if NORMALIZE else OcrParams()
+    return frame.cache["ocr_params"]
+
+
+def normalize_for_ocr(frame: Frame) -> tuple[np.ndarray, OcrParams]:
+    params = ocr_params(frame)
+    image = frame.gray
+
+    if params.crop:
+        x1, y1, x2, y2 = params.crop
+        image = image[y1:y2, x1:x2]
+
+    if params.rotation is not None:
+        height, width = image.shape[:2]
+        image = cv2.warpAffine(
+            image,
+            params.rotation,
+            (width, height),
+            flags=cv2.INTER_LINEAR,
+            borderMode=cv2.BORDER_REPLICATE,
+        )
+
+    if params.scale != 1.0:
+        interpolation = cv2.INTER_AREA if params.scale < 1 else cv2.INTER_CUBIC
+        image = cv2.resize(
+            image, None, fx=params.scale, fy=params.scale, interpolation=interpolation
+        )
+
+    image = cv2.medianBlur(np.ascontiguousarray(image), 3)
+
+    if BINARIZE:
+        _, image = cv2.threshold(image, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+
+    return image, params
+
+
+def boxes_to_original(boxes: np.ndarray, params: OcrParams) -> np.ndarray:
+    """Lleva cajas (x, y, w, h) de la imagen normalizada a la imagen original."""
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+    x1, y1 = boxes[:, 0] / params.scale, boxes[:, 1] / params.scale
+    x2 = (boxes[:, 0] + boxes[:, 2]) / params.scale
+    y2 = (boxes[:, 1] + boxes[:, 3]) / params.scale
+
+    if params.rotation is not None:
+        inverse = cv2.invertAffineTransform(params.rotation)
+        corners = np.stack(
+            [
+                np.stack([x1, y1], axis=1),
+                np.stack([x2, y1], axis=1),
+                np.stack([x1, y2], axis=1),
+                np.stack([x2, y2], axis=1),
+            ],
+            axis=1,
+        )
+        mapped = corners @ inverse[:, :2].T + inverse[:, 2]
+        x1, y1 = mapped[..., 0].min(axis=1), mapped[..., 1].min(axis=1)
+        x2, y2 = mapped[..., 0].max(axis=1), mapped[..., 1].max(axis=1)
+
+    if params.crop:
+        x1, x2 = x1 + params.crop[0], x2 + params.crop[0]
+        y1, y2 = y1 + params.crop[1], y2 + params.crop[1]
+
+    return np.stack([x1, y1, x2 - x1, y2 - y1], axis=1).round().astype(np.int32)
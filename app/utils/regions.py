@@ -0,0 +1,60 @@
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+
+def merge_boxes(boxes: np.ndarray, gap_x: float, gap_y: float) -> np.ndarray:
+    """Une cajas cercanas (x1, y1, x2, y2) en regiones por componentes conexas."""
+    if len(boxes) == 0:
+        return np.empty((0, 4), dtype=np.int32)
+
+    boxes = boxes.astype(np.float64)
+    x1, y1 = boxes[:, 0] - gap_x, boxes[:, 1] - gap_y
+    x2, y2 = boxes[:, 2] + gap_x, boxes[:, 3] + gap_y
+
+    # ? Sweep over y: only boxes whose gap-expanded rows overlap are candidate
+    # ? pairs, so a page costs about one text line squared, not n squared
+    n = len(boxes)
+    order = np.argsort(y1, kind="stable")
+    ends = np.searchsorted(y1[order], y2[order], side="right")
+    counts = np.maximum(ends - np.arange(1, n + 1), 0)
+    first = np.repeat(np.arange(n), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    a, b = order[first], order[first + 1 + offsets]
+
+    # ? Two boxes touch when their gap-expanded rectangles overlap
+    touching = (x1[a] <= x2[b]) & (x1[b] <= x2[a])
+    graph = coo_matrix(
+        (np.ones(int(touching.sum()), dtype=bool), (a[touching], b[touching])),
+        shape=(n, n),
+    )
+    _, groups = connected_components(graph, directed=False)
+
+    regions = np.empty((groups.max() + 1, 4), dtype=np.float64)
+    regions[:, :2] = np.inf
+    regions[:, 2:] = -np.inf
+    np.minimum.at(regions[:, 0], groups, boxes[:, 0])
+    np.minimum.at(regions[:, 1], groups, boxes[:, 1])
+    np.maximum.at(regions[:, 2], groups, boxes[:, 2])
+    np.maximum.at(regions[:, 3], groups, boxes[:, 3])
+    return regions.round().astype(np.int32)
+
+
+def pad_boxes(boxes: np.ndarray, pad: int, width: int, height: int) -> np.ndarray:
+    padded = boxes.astype(np.int64) + np.array([-pad, -pad, pad, pad])
+    padded[:, [0, 2]] = np.clip(padded[:, [0, 2]], 0, width)
+    padded[:, [1, 3]] = np.clip(padded[:, [1, 3]], 0, height)
+    return padded.astype(np.int32)
+
+
+def reading_order(boxes: np.ndarray, line_height: float) -> np.ndarray:
+    """Índices de las cajas de arriba hacia abajo y, en cada renglón, de izquierda a derecha."""
+    if len(boxes) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    centers = (boxes[:, 1] + boxes[:, 3]) / 2
+    order = np.argsort(centers, kind="stable")
+    breaks = np.diff(centers[order]) > line_height / 2
+    lines = np.empty(len(boxes), dtype=np.int64)
+    lines[order] = np.concatenate(([0], np.cumsum(breaks)))
+    return np.lexsort((boxes[:, 0], lines))
@@ -0,0 +1,126 @@
+import io
+import os
+import cv2
+import numpy as np
+from functools import lru_cache
+from dotenv import load_dotenv
+from PIL import Image, ImageDraw, ImageFont
+
+load_dotenv()
+
+# ? Codec and quality of the annotated images returned by the overlay endpoints
+RENDER_FORMAT = os.getenv("RENDER_FORMAT", "jpeg").lower()
+RENDER_QUALITY = int(os.getenv("RENDER_QUALITY", "85"))
+RENDER_FONT = os.getenv("RENDER_FONT", "fonts/DejaVuSans.ttf")
+SPRITE_CACHE_SIZE = int(os.getenv("RENDER_SPRITE_CACHE_SIZE", "4096"))
+PREVIEW_MAX_SIZE = int(os.getenv("RENDER_PREVIEW_MAX_SIZE", "640"))
+
+MEDIA_TYPES = {
+    "jpeg": "image/jpeg",
+    "jpg": "image/jpeg",
+    "png": "image/png",
+    "webp": "image/webp",
+}
+
+if RENDER_FORMAT not in MEDIA_TYPES:
+    raise ValueError(f"RENDER_FORMAT no soportado: {RENDER_FORMAT}")
+
+RENDER_MEDIA_TYPE = MEDIA_TYPES[RENDER_FORMAT]
+
+
+def rgb_to_bgr(color: tuple) -> tuple:
+    return tuple(int(c) for c in color[::-1])
+
+
+@lru_cache(maxsize=8)
+def load_font(size: int):
+    try:
+        return ImageFont.truetype(RENDER_FONT, size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+@lru_cache(maxsize=SPRITE_CACHE_SIZE)
+def label_sprite(
+    text: str, font_size: int = 16, font_color=(255, 255, 255), bg_color=(0, 0, 0)
+) -> np.ndarray:
+    """Etiqueta renderizada una sola vez (BGR) y reutilizada en cada dibujo."""
+    font = load_font(font_size)
+    left, top, right, bottom = font.getbbox(text)
+    width, height = right - left + 4, bottom - top + 6
+
+    sprite = Image.new("RGB", (max(width, 1), max(height, 1)), bg_color)
+    ImageDraw.Draw(sprite).text((2 - left, 3 - top), text, font=font, fill=font_color)
+
+    sprite = np.ascontiguousarray(np.asarray(sprite)[:, :, ::-1])
+    sprite.flags.writeable = False
+    return sprite
+
+
+def downscale(img: np.ndarray, max_size: int = PREVIEW_MAX_SIZE):
+    """Copia reducida para que el lado mayor no supere `max_size`, y su escala."""
+    height, width = img.shape[:2]
+    scale = min(1.0, max_size / max(height, width))
+    if scale == 1.0:
+        return img.copy(), scale
+
+    size = (max(1, round(width * scale)), max(1, round(height * scale)))
+    return cv2.resize(img, size, interpolation=cv2.INTER_AREA), scale
+
+
+def paste_label(img: np.ndarray, sprite: np.ndarray, x: int, y: int) -> None:
+    # ? Label sits above the box, pushed inside the image near the borders
+    height, width = sprite.shape[:2]
+    img_h, img_w = img.shape[:2]
+    y0 = y - height if y - height >= 0 else y
+    x0 = min(max(x, 0), max(img_w - width, 0))
+    y0 = min(max(y0, 0), max(img_h - height, 0))
+
+    region = img[y0 : y0 + height, x0 : x0 + width]
+    region[...] = sprite[: region.shape[0], : region.shape[1]]
+
+
+def draw_labeled_boxes(
+    img: np.ndarray,
+    boxes,
+    labels,
+    border_color=(245, 166, 35),
+    font_color=(255, 255, 255),
+    bg_color=(245, 166, 35),
+    thickness=2,
+    font_size=16,
+) -> np.ndarray:
+    """Dibuja cajas (x1, y1, x2, y2) y sus etiquetas sobre `img` (BGR) en sitio."""
+    border = rgb_to_bgr(border_color)
+    font_color, bg_color = tuple(font_color), tuple(bg_color)
+
+    for (x1, y1, x2, y2), label in zip(boxes, labels):
+        x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
+        cv2.rectangle(img, (x1, y1), (x2, y2), border, thickness)
+        if label:
+            paste_label(
+                img, label_sprite(label, font_size, font_color, bg_color), x1, y1
+            )
+
+    return img
+
+
+def encode_image(
+    img: np.ndarray, fmt: str = RENDER_FORMAT, quality: int = RENDER_QUALITY
+) -> io.BytesIO:
+    fmt = fmt.lower()
+    if fmt in ("jpeg", "jpg"):
+        ext, params = ".jpg", [cv2.IMWRITE_JPEG_QUALITY, quality]
+    elif fmt == "webp":
+        ext, params = ".webp", [cv2.IMWRITE_WEBP_QUALITY, quality]
+    elif fmt == "png":
+        # ? PNG is lossless: quality 0-100 maps to compression 9-0
+        ext, params = ".png", [cv2.IMWRITE_PNG_COMPRESSION, 9 - quality * 9 // 100]
+    else:
+        raise ValueError(f"Formato de imagen no soportado: {fmt}")
+
+    ok, buffer = cv2.imencode(ext, img, params)
+    if not ok:
+        raise ValueError(f"No se pudo codificar la imagen como {fmt}")
+
+    return io.BytesIO(buffer.tobytes())
@@ -0,0 +1,70 @@
+import json
+import time
+import asyncio
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+# Core
+from app.core.executor import ServiceBusy, run_task
+from app.core.messages import Messages
+
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+
+def encode_record(record: dict, fmt: str = "ndjson", event: str = "page") -> bytes:
+    data = json.dumps(record, ensure_ascii=False)
+    if fmt == "sse":
+        return f"event: {event}\ndata: {data}\n\n".encode("utf-8")
+    return f"{data}\n".encode("utf-8")
+
+
+async def stream_pages(files, process_page, fmt: str = "ndjson"):
+    """Procesa las páginas en orden y emite un registro por página apenas termina."""
+    started = time.perf_counter()
+    successful_uploads = 0
+    failed_uploads = 0
+
+    for index, file in enumerate(files):
+        page_started = time.perf_counter()
+        record = {"index": index, "filename": file.filename}
+
+        # ? One page per worker slot: the stream only holds the current page
+        try:
+            record.update(await run_task(process_page, file))
+            record["status"] = "success"
+            successful_uploads += 1
+        except ServiceBusy:
+            record.update(status="error", error=Messages.THROTTLER_EXCEPTION.value)
+        except asyncio.TimeoutError:
+            record.update(status="error", error=Messages.TASK_TIMEOUT.value)
+        except HTTPException as e:
+            record.update(status="error", error=str(e.detail))
+        except Exception as e:
+            record.update(
+                status="error", error=f"{Messages.IMAGE_UPLOAD_ERROR.value}: {e}"
+            )
+
+        if record["status"] == "error":
+            failed_uploads += 1
+
+        record["elapsed_ms"] = round((time.perf_counter() - page_started) * 1000, 1)
+        yield encode_record(record, fmt)
+
+    summary = {
+        "total_files": len(files),
+        "successful_uploads": successful_uploads,
+        "failed_uploads": failed_uploads,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+    yield encode_record(summary, fmt, event="done")
+
+
+def streaming_pages_response(files, process_page, fmt: str = "ndjson"):
+    return StreamingResponse(
+        stream_pages(files, process_page, fmt),
+        media_type=STREAM_MEDIA_TYPES[fmt],
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
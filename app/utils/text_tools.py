@@ -1,95 +1,150 @@
-import io
 import os
-import shutil
-import numpy as np
 import cv2
-import pytesseract
-from PIL import Image, ImageDraw, ImageFont
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException
+from dotenv import load_dotenv
 
 # Core
 from app.core.messages import Messages
+from app.core.logging_config import get_logger
 
 # Utils
-from app.utils.brf import text_to_ascii_braille
-from app.utils.file import generate_unique_filename
-
-
-def draw_text_detections(
-    image_path: str,
-    confidence_threshold: int = 30,
-    border_color=(245, 166, 35),
-    font_color=(255, 255, 255),
-    bg_color=(245, 166, 35),
-    thickness=2,
-    font_size=16,
-    show_confidence=False,
-    show_braille=True,
-):
-    img_pil = Image.open(image_path).convert("RGB")
-    draw = ImageDraw.Draw(img_pil)
-
-    try:
-        font = ImageFont.truetype("fonts/DejaVuSans.ttf", font_size)
-    except:
-        font = ImageFont.load_default()
-
-    custom_config = r"--oem 3 --psm 6"
-    data = pytesseract.image_to_data(
-        np.array(img_pil), config=custom_config, output_type=pytesseract.Output.DICT
-    )
+from app.utils.brf import words_to_ascii_braille
+from app.utils.cache import cache_key, recognition_cache
+from app.utils.file import content_hash, read_upload
+from app.utils.frame import Frame
+from app.utils.ocr import OCR_SLOTS, PAGE_WORKERS, image_to_data, ocr_signature
+from app.utils.ocr_preprocess import (
+    NORMALIZE,
+    OcrParams,
+    boxes_to_original,
+    normalize_for_ocr,
+    preprocess_signature,
+)
+from app.utils.regions import merge_boxes, pad_boxes, reading_order
+from app.utils.render import (
+    PREVIEW_MAX_SIZE,
+    downscale,
+    draw_labeled_boxes,
+    encode_image,
+)
+
+# Models
+from app.models.predictor_text import MODEL_NAME, detect_text_boxes
+from app.models.registry import model_path
+
+load_dotenv()
+
+logger = get_logger()
+
+# ? Opt-in: the text detector finds character boxes and only the merged
+# ? regions around them are sent to Tesseract, in parallel
+DETECTION_GUIDED_OCR = os.getenv("OCR_DETECTION_GUIDED", "false").lower() == "true"
+REGION_CONF = float(os.getenv("OCR_REGION_CONF", "0.25"))
+REGION_GAP_FACTOR = float(os.getenv("OCR_REGION_GAP_FACTOR", "1.0"))
+REGION_PADDING = int(os.getenv("OCR_REGION_PADDING", "8"))
+# ? Pool sizes only need to reach the shared OCR slots; Tesseract concurrency
+# ? itself is capped in image_to_data
+REGION_WORKERS = int(os.getenv("OCR_REGION_WORKERS", "0")) or OCR_SLOTS
+
+_region_executor = ThreadPoolExecutor(
+    max_workers=REGION_WORKERS, thread_name_prefix="ocr-region"
+)
+_page_executor = ThreadPoolExecutor(
+    max_workers=PAGE_WORKERS, thread_name_prefix="ocr-page"
+)
+
+
+def extract_word_detections(
+    frame: Frame, confidence_threshold: int = 30, show_braille: bool = True
+) -> list[dict]:
+    # ? Without normalization the overlay keeps reading the color page as before
+    if NORMALIZE:
+        image, params = normalize_for_ocr(frame)
+    else:
+        image, params = frame.rgb, OcrParams()
+    data = image_to_data(image, psm=6)
 
     detections = []
-
     for i in range(len(data["level"])):
         if int(data["conf"][i]) > confidence_threshold:
-            x, y, w, h = (
-                data["left"][i],
-                data["top"][i],
-                data["width"][i],
-                data["height"][i],
-            )
             text = data["text"][i].strip()
 
             if text:
-                img_np = np.array(img_pil)
-                cv2.rectangle(img_np, (x, y), (x + w, y + h), border_color, thickness)
-                img_pil = Image.fromarray(img_np)
-                draw = ImageDraw.Draw(img_pil)
-
-                if show_braille:
-                    braille_text = text_to_ascii_braille(text)
-                    display_text = f"{braille_text}"
-                else:
-                    display_text = text
-
-                if show_confidence:
-                    display_text = f"{display_text} {int(data['conf'][i])}%"
-
-                bbox = draw.textbbox((0, 0), display_text, font=font)
-                text_w, text_h = bbox[2] - bbox[0], bbox[3] - bbox[1]
-
-                draw.rectangle([x, y - text_h - 6, x + text_w + 4, y], fill=bg_color)
-
-                draw.text(
-                    (x + 2, y - text_h - 2), display_text, font=font, fill=font_color
-                )
-
                 detections.append(
                     {
                         "text": text,
-                        "braille": (
-                            text_to_ascii_braille(text) if show_braille else None
-                        ),
+                        "braille": None,
                         "confidence": int(data["conf"][i]),
-                        "bbox": [x, y, w, h],
+                        "bbox": [
+                            data["left"][i],
+                            data["top"][i],
+                            data["width"][i],
+                            data["height"][i],
+                        ],
                     }
                 )
 
-    img_bytes = io.BytesIO()
-    img_pil.save(img_bytes, format="JPEG")
-    img_bytes.seek(0)
+    # ? OCR ran on the normalized image; boxes go back to original pixels
+    if detections:
+        boxes = boxes_to_original([det["bbox"] for det in detections], params)
+        for det, box in zip(detections, boxes.tolist()):
+            det["bbox"] = box
+
+    # ? One translation for the whole page, cut back into words by position;
+    # ? shared by label and payload
+    if show_braille:
+        brailles = words_to_ascii_braille([det["text"] for det in detections])
+        for det, braille in zip(detections, brailles):
+            det["braille"] = braille
+
+    return detections
 
-    return img_bytes, detections
+
+def draw_text_detections(
+    frame: Frame,
+    confidence_threshold: int = 30,
+    border_color=(245, 166, 35),
+    font_color=(255, 255, 255),
+    bg_color=(245, 166, 35),
+    thickness=2,
+    font_size=16,
+    show_confidence=False,
+    show_braille=True,
+    max_size: int | None = None,
+):
+    detections = extract_word_detections(frame, confidence_threshold, show_braille)
+
+    if max_size:
+        img, scale = downscale(frame.image, max_size)
+    else:
+        img, scale = frame.image.copy(), 1.0
+
+    boxes = [
+        tuple(round(v * scale) for v in (x, y, x + w, y + h))
+        for x, y, w, h in (det["bbox"] for det in detections)
+    ]
+    labels = []
+    for det in detections:
+        display_text = det["braille"] if show_braille else det["text"]
+        if show_confidence:
+            display_text = f"{display_text} {det['confidence']}%"
+        labels.append(display_text)
+
+    # ? Drawn once on a single BGR buffer after OCR
+    draw_labeled_boxes(
+        img,
+        boxes,
+        labels,
+        border_color=border_color,
+        font_color=font_color,
+        bg_color=bg_color,
+        thickness=thickness,
+        font_size=font_size,
+    )
+
+    return encode_image(img), detections
 
 
 def image_text_to_segmentation(
@@ -98,19 +153,25 @@ def image_text_to_segmentation(
     iou_threshold: float = 0.15,
     confidence_threshold: int = 30,
     show_confidence: bool = False,
+    output: str = "image",
 ):
     try:
-        safe_filename = generate_unique_filename(file.filename)
-        temp_path = os.path.join("/tmp", safe_filename)
+        frame = Frame.from_upload(file)
 
-        with open(temp_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # ? json skips drawing/encoding; the client renders the overlay itself
+        if output == "json":
+            return {
+                "width": frame.width,
+                "height": frame.height,
+                "detections": extract_word_detections(frame, confidence_threshold),
+            }
 
         img_bytes, _ = draw_text_detections(
-            temp_path,
+            frame,
             confidence_threshold,
             show_confidence=False,
             show_braille=True,
+            max_size=PREVIEW_MAX_SIZE if output == "preview" else None,
         )
         return img_bytes
 
@@ -119,20 +180,10 @@ def image_text_to_segmentation(
 
 
 def extract_text(
-    image_path: str, confidence_threshold: int = 30, lang: str = "eng"
+    frame: Frame, confidence_threshold: int = 30, lang: str = "eng"
 ) -> str:
-    img = cv2.imread(image_path)
-    if img is None:
-        return ""
-
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    denoised = cv2.medianBlur(gray, 3)
-
-    custom_config = r"--oem 3 --psm 6"
-
-    data = pytesseract.image_to_data(
-        denoised, lang=lang, config=custom_config, output_type=pytesseract.Output.DICT
-    )
+    image, _ = normalize_for_ocr(frame)
+    data = image_to_data(image, lang=lang, psm=6)
 
     filtered_texts = []
     for i in range(len(data["level"])):
@@ -144,6 +195,61 @@ def extract_text(
     return " ".join(filtered_texts)
 
 
+def text_regions(frame: Frame) -> np.ndarray:
+    boxes = detect_text_boxes(frame.image, conf_threshold=REGION_CONF)
+    if len(boxes) == 0:
+        return boxes
+
+    char_height = float(np.median(boxes[:, 3] - boxes[:, 1]))
+    regions = merge_boxes(
+        boxes, gap_x=char_height * REGION_GAP_FACTOR, gap_y=char_height * 0.2
+    )
+    regions = pad_boxes(regions, REGION_PADDING, frame.width, frame.height)
+    return regions[reading_order(regions, char_height)]
+
+
+def extract_text_regions(
+    frame: Frame, confidence_threshold: int = 30, lang: str = "eng"
+) -> str:
+    regions = text_regions(frame)
+
+    # ? Nothing detected: the detector may have missed, so read the whole page
+    if len(regions) == 0:
+        return extract_text(frame, confidence_threshold, lang)
+
+    def read_region(region) -> str:
+        x1, y1, x2, y2 = region
+        crop = Frame(frame.filename, np.ascontiguousarray(frame.image[y1:y2, x1:x2]))
+        return extract_text(crop, confidence_threshold, lang)
+
+    texts = _region_executor.map(read_region, regions.tolist())
+    return " ".join(text for text in texts if text)
+
+
+def region_signature() -> str:
+    return (
+        f"{model_path(MODEL_NAME)}:{REGION_CONF}:{REGION_GAP_FACTOR}:{REGION_PADDING}"
+    )
+
+
+def extract_page_text(
+    data: bytes,
+    filename: str,
+    digest: str,
+    confidence_threshold: int = 30,
+    lang: str = "eng",
+) -> str:
+    try:
+        frame = Frame.from_bytes(data, filename, digest)
+    except HTTPException as e:
+        # ? An unreadable page reads as empty instead of failing the whole batch
+        logger.warning(e.detail)
+        return ""
+
+    extract = extract_text_regions if DETECTION_GUIDED_OCR else extract_text
+    return extract(frame, confidence_threshold, lang)
+
+
 def image_text_to_text(
     file,
     conf_threshold: float = 0.001,
@@ -153,14 +259,43 @@ def image_text_to_text(
     lang: str = "eng",
 ) -> str:
     try:
-        safe_filename = generate_unique_filename(file.filename)
-        temp_path = os.path.join("/tmp", safe_filename)
-
-        with open(temp_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-
-        text = extract_text(temp_path, confidence_threshold, lang)
-        return text
+        data = read_upload(file)
+        digest = content_hash(data)
+        key = cache_key(
+            "text",
+            digest,
+            ocr_signature(),
+            preprocess_signature(),
+            DETECTION_GUIDED_OCR and region_signature(),
+            confidence_threshold,
+            lang,
+        )
+        return recognition_cache.get_or_compute(
+            key,
+            lambda: extract_page_text(
+                data, file.filename, digest, confidence_threshold, lang
+            ),
+        )
 
     except Exception as e:
         raise RuntimeError(f"{Messages.EXCEPTION_DEFAULT}: {e}")
+
+
+def images_text_to_text(
+    files,
+    conf_threshold: float = 0.001,
+    confidence_threshold: int = 30,
+    lang: str = "eng",
+) -> list[str]:
+    # ? Pages are OCR'd in parallel; map keeps the upload order
+    return list(
+        _page_executor.map(
+            lambda file: image_text_to_text(
+                file,
+                conf_threshold=conf_threshold,
+                confidence_threshold=confidence_threshold,
+                lang=lang,
+            ),
+            files,
+        )
+    )
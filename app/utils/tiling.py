@@ -0,0 +1,82 @@
+import numpy as np
+
+
+def tile_origins(length: int, tile_size: int, overlap: int) -> list[int]:
+    # ? Last tile is aligned to the edge so every tile keeps the full size
+    if length <= tile_size:
+        return [0]
+
+    stride = max(1, tile_size - overlap)
+    origins = list(range(0, length - tile_size, stride))
+    origins.append(length - tile_size)
+    return origins
+
+
+def iter_tiles(image: np.ndarray, tile_size: int = 640, overlap: int = 128):
+    """Genera (x0, y0, tile) sin copiar píxeles: cada tile es una vista de la imagen."""
+    height, width = image.shape[:2]
+    for y0 in tile_origins(height, tile_size, overlap):
+        for x0 in tile_origins(width, tile_size, overlap):
+            yield x0, y0, image[y0 : y0 + tile_size, x0 : x0 + tile_size]
+
+
+def iter_tile_batches(
+    image: np.ndarray, tile_size: int = 640, overlap: int = 128, batch_size: int = 8
+):
+    batch = []
+    for tile in iter_tiles(image, tile_size, overlap):
+        batch.append(tile)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def inner_edge_mask(
+    boxes: np.ndarray,
+    x0: int,
+    y0: int,
+    tile_shape: tuple[int, int],
+    image_shape: tuple[int, int],
+    margin: int = 2,
+) -> np.ndarray:
+    # ? Boxes cut by a tile border that is not an image border are partial
+    # ? cells; the overlapping neighbour tile sees them whole
+    tile_h, tile_w = tile_shape
+    image_h, image_w = image_shape
+    keep = np.ones(len(boxes), dtype=bool)
+
+    if x0 > 0:
+        keep &= boxes[:, 0] > margin
+    if y0 > 0:
+        keep &= boxes[:, 1] > margin
+    if x0 + tile_w < image_w:
+        keep &= boxes[:, 2] < tile_w - margin
+    if y0 + tile_h < image_h:
+        keep &= boxes[:, 3] < tile_h - margin
+    return keep
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """Índices que sobreviven a una supresión de no máximos sin distinción de clase."""
+    x1, y1, x2, y2 = boxes.T.astype(np.float64)
+    areas = (x2 - x1) * (y2 - y1)
+    order = np.argsort(-scores, kind="stable")
+
+    keep = []
+    while order.size:
+        best, rest = order[0], order[1:]
+        keep.append(best)
+
+        w = np.clip(
+            np.minimum(x2[best], x2[rest]) - np.maximum(x1[best], x1[rest]), 0, None
+        )
+        h = np.clip(
+            np.minimum(y2[best], y2[rest]) - np.maximum(y1[best], y1[rest]), 0, None
+        )
+        intersection = w * h
+        iou = intersection / (areas[best] + areas[rest] - intersection + 1e-9)
+        order = rest[iou <= iou_threshold]
+
+    return np.array(keep, dtype=np.int64)